@@ -13,6 +13,8 @@ class Transaction:
     description_secondary: str
     description: str
     raw_json: str | None = None
+    # encode_name(description_secondary), computed once at insert time.
+    counterparty_key: str | None = None
 
     @classmethod
     def from_scrape(
@@ -54,3 +56,6 @@ class Review:
     last_error: str | None
     created_at: str | None
     updated_at: str | None
+    # Deposits: payer-name match score. Spent: confidence of a history-based
+    # suggestion, None when a rule decided.
+    suggestion_score: float | None = None
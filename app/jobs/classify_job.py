@@ -1,46 +1,59 @@
 from __future__ import annotations
 
+import argparse
 import os
+from itertools import islice
 
 from dotenv import load_dotenv
 
 from app.processing.classifier import classify_transactions
-from app.storage.db import get_connection, init_db
+from app.processing.payer_index import PayerIndex
+from app.processing.rules import RuleTable, load_rule_table
+from app.processing.suggestions import SuggestionIndex
+from app.storage.db import get_connection
 from app.storage.repo import ReviewRepository, TransactionRepository
 from app.sheets.client import SheetsClient
 from app.sheets.service import SheetsService
-from app.domain.models import Review
+from app.domain.models import Review, Transaction
 
 
-def run_classify_job(limit: int = 50) -> int:
-    load_dotenv("data/.env")
-    spreadsheet_id = os.getenv("SHEETS_ID")
-    credentials_file = os.getenv("GOOGLE_CREDENTIALS")
-    if not spreadsheet_id or not credentials_file:
-        raise RuntimeError("SHEETS_ID and GOOGLE_CREDENTIALS must be set.")
+def _classify_batch(
+    tx_repo: TransactionRepository,
+    review_repo: ReviewRepository,
+    transactions: list[Transaction],
+    names_to_nicknames: dict[str, str],
+    rules: RuleTable,
+    suggestions: SuggestionIndex,
+    payers: PayerIndex,
+    auto_approve: float | None,
+) -> int:
+    classified = classify_transactions(
+        transactions, names_to_nicknames, rules, suggestions, payers
+    )
 
-    sheets = SheetsService(SheetsClient(spreadsheet_id, credentials_file))
-    names_to_nicknames = sheets.get_payment_names()
+    ignored: list[str] = []
+    reviews: list[Review] = []
+    for item in classified:
+        mp_id = item.transaction.mp_id
+        if item.classification.kind == "ignore":
+            ignored.append(mp_id)
+            continue
 
-    with get_connection() as conn:
-        init_db(conn)
-        tx_repo = TransactionRepository(conn)
-        review_repo = ReviewRepository(conn)
-
-        transactions = tx_repo.get_transactions_by_status("new", limit)
-        classified = classify_transactions(transactions, names_to_nicknames)
-
-        for item in classified:
-            mp_id = item.transaction.mp_id
-            if item.classification.kind == "ignore":
-                tx_repo.set_status(mp_id, "ignored")
-                continue
-
-            review = Review(
+        # Only history suggestions for spent rows are auto-approved; rule
+        # results and deposits still go through Telegram.
+        score = item.classification.score
+        approved = (
+            auto_approve is not None
+            and item.classification.kind == "spent"
+            and score is not None
+            and score >= auto_approve
+        )
+        reviews.append(
+            Review(
                 id=None,
                 mp_id=mp_id,
                 kind=item.classification.kind,
-                status="pending_send",
+                status="approved" if approved else "pending_send",
                 suggested_description=item.classification.suggested_description,
                 suggested_category=item.classification.suggested_category,
                 suggested_nickname=item.classification.suggested_nickname,
@@ -52,13 +65,92 @@ def run_classify_job(limit: int = 50) -> int:
                 last_error=None,
                 created_at=None,
                 updated_at=None,
+                suggestion_score=score,
+            )
+        )
+
+    # One commit for the batch: a crash leaves every row "new" again
+    # rather than a transaction marked classified without its review.
+    with tx_repo.transaction():
+        tx_repo.set_status_batch(ignored, "ignored")
+        review_repo.create_reviews(reviews)
+        tx_repo.set_status_batch([review.mp_id for review in reviews], "classified")
+
+    return len(classified)
+
+
+def _auto_approve_threshold() -> float | None:
+    # SUGGESTION_AUTO_APPROVE=0.9 approves history suggestions scoring at
+    # least 0.9 without asking; unset keeps every review manual. Anything
+    # outside (0, 1] is refused rather than approving every suggestion.
+    value = os.getenv("SUGGESTION_AUTO_APPROVE")
+    if not value:
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = None
+    if threshold is None or not 0 < threshold <= 1:
+        raise RuntimeError(
+            f"SUGGESTION_AUTO_APPROVE must be a number above 0 and at most 1, got {value!r}."
+        )
+    return threshold
+
+
+def run_classify_job(limit: int = 50, drain: bool = False) -> int:
+    load_dotenv("data/.env")
+    spreadsheet_id = os.getenv("SHEETS_ID")
+    credentials_file = os.getenv("GOOGLE_CREDENTIALS")
+    if not spreadsheet_id or not credentials_file:
+        raise RuntimeError("SHEETS_ID and GOOGLE_CREDENTIALS must be set.")
+
+    sheets = SheetsService(SheetsClient(spreadsheet_id, credentials_file))
+    names_to_nicknames = sheets.get_payment_names()
+    rules = load_rule_table(os.getenv("CLASSIFIER_RULES"), sheets.get_rules())
+    auto_approve = _auto_approve_threshold()
+
+    with get_connection() as conn:
+        tx_repo = TransactionRepository(conn)
+        review_repo = ReviewRepository(conn)
+        suggestions = SuggestionIndex.build(review_repo.category_history())
+        payers = PayerIndex(names_to_nicknames)
+
+        if not drain:
+            transactions = tx_repo.get_transactions_by_status("new", limit)
+            return _classify_batch(
+                tx_repo,
+                review_repo,
+                transactions,
+                names_to_nicknames,
+                rules,
+                suggestions,
+                payers,
+                auto_approve,
             )
-            review_repo.create_review(review)
-            tx_repo.set_status(mp_id, "classified")
 
-        return len(classified)
+        # Drain: work through the whole backlog in batches of `limit`.
+        total = 0
+        stream = tx_repo.iter_transactions_by_status("new", chunk_size=limit)
+        while batch := list(islice(stream, limit)):
+            total += _classify_batch(
+                tx_repo,
+                review_repo,
+                batch,
+                names_to_nicknames,
+                rules,
+                suggestions,
+                payers,
+                auto_approve,
+            )
+        return total
 
 
 if __name__ == "__main__":
-    count = run_classify_job()
+    parser = argparse.ArgumentParser(description="Classify new transactions.")
+    parser.add_argument("--limit", type=int, default=50, help="batch size")
+    parser.add_argument(
+        "--drain", action="store_true", help="classify every new transaction"
+    )
+    args = parser.parse_args()
+    count = run_classify_job(args.limit, drain=args.drain)
     print(f"classified={count}")
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+from app.storage.db import enable_incremental_vacuum, get_connection, incremental_vacuum
+from app.storage.repo import ArchiveRepository
+
+ARCHIVE_AFTER_DAYS = 90
+
+
+def run_compact_job(older_than_days: int | None = None) -> tuple[int, int, int, int]:
+    load_dotenv("data/.env")
+    if older_than_days is None:
+        older_than_days = int(os.getenv("ARCHIVE_AFTER_DAYS", str(ARCHIVE_AFTER_DAYS)))
+
+    with get_connection() as conn:
+        repo = ArchiveRepository(conn)
+        compressed = repo.compress_raw_json()
+        archived_transactions, archived_reviews = repo.archive_finished(older_than_days)
+        # The first run rebuilds the file with auto_vacuum on, which already
+        # drops every free page.
+        freed_pages = 0
+        if not enable_incremental_vacuum(conn):
+            freed_pages = incremental_vacuum(conn)
+
+    return compressed, archived_transactions, archived_reviews, freed_pages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Archive finished rows and compact the database."
+    )
+    parser.add_argument(
+        "--days", type=int, help="archive rows finished more than this many days ago"
+    )
+    args = parser.parse_args()
+    compressed, transactions, reviews, freed = run_compact_job(args.days)
+    print(
+        f"compressed={compressed} archived_transactions={transactions} "
+        f"archived_reviews={reviews} freed_pages={freed}"
+    )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import csv
+from pathlib import Path
+
+from app.storage.db import get_connection
+from app.storage.repo import ITER_CHUNK_SIZE, ReportRepository
+
+FORMATS = {"csv", "parquet"}
+
+
+def _write_csv(path: Path, chunks) -> int:
+    rows = 0
+    with path.open("w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(ReportRepository.EXPORT_COLUMNS)
+        for chunk in chunks:
+            writer.writerows(tuple(row) for row in chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(path: Path, chunks) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet export needs pyarrow (pip install pyarrow)."
+        ) from exc
+
+    schema = pa.schema(
+        [
+            ("mp_id", pa.string()),
+            ("occurred_at", pa.string()),
+            ("amount", pa.float64()),
+            ("direction", pa.string()),
+            ("description", pa.string()),
+            ("transaction_status", pa.string()),
+            ("review_id", pa.int64()),
+            ("kind", pa.string()),
+            ("review_status", pa.string()),
+            ("final_description", pa.string()),
+            ("category", pa.string()),
+            ("nickname", pa.string()),
+        ]
+    )
+    rows = 0
+    # One row group per chunk, so memory stays at one chunk.
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for chunk in chunks:
+            columns = {
+                name: [row[name] for row in chunk] for name in schema.names
+            }
+            writer.write_table(pa.table(columns, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def run_export_job(
+    path: str | Path, fmt: str | None = None, chunk_size: int = ITER_CHUNK_SIZE
+) -> int:
+    path = Path(path)
+    fmt = fmt or ("parquet" if path.suffix == ".parquet" else "csv")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(FORMATS)}.")
+
+    with get_connection() as conn:
+        chunks = ReportRepository(conn).iter_export_chunks(chunk_size)
+        if fmt == "parquet":
+            return _write_parquet(path, chunks)
+        return _write_csv(path, chunks)
+
+
+def print_monthly_report(since_month: str | None = None) -> None:
+    with get_connection() as conn:
+        repo = ReportRepository(conn)
+        categories = repo.monthly_category_totals(since_month)
+        deposits = repo.monthly_nickname_deposits(since_month)
+    print("spent per month and category:")
+    for row in categories:
+        print(f"  {row['month']}  {row['category']:<24} {row['total']:>12.2f}  x{row['count']}")
+    print("deposits per month and nickname:")
+    for row in deposits:
+        print(f"  {row['month']}  {row['nickname']:<24} {row['total']:>12.2f}  x{row['count']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export transactions with their reviews, or print monthly totals."
+    )
+    parser.add_argument("path", nargs="?", help="output file (.csv or .parquet)")
+    parser.add_argument("--format", choices=sorted(FORMATS), help="defaults to the file suffix")
+    parser.add_argument(
+        "--report", action="store_true", help="print monthly totals and exit"
+    )
+    parser.add_argument("--since", help="first month of the report (YYYY-MM)")
+    args = parser.parse_args()
+    if args.report:
+        print_monthly_report(args.since)
+        raise SystemExit(0)
+    if not args.path:
+        parser.error("path is required unless --report is given")
+    exported = run_export_job(args.path, args.format)
+    print(f"exported={exported} path={args.path}")
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from app.processing.bulk_classifier import RESULT_COLUMNS, classify_frame
+from app.processing.payer_index import PayerIndex
+from app.processing.rules import load_rule_table
+from app.processing.suggestions import SuggestionIndex
+from app.sheets.client import SheetsClient
+from app.sheets.service import SheetsService
+from app.storage.db import get_connection
+from app.storage.repo import ReviewRepository
+
+# Reviews not sent to Telegram yet. Others only change when asked for
+# explicitly (--status approved ...), and then only their suggestions.
+# Archived reviews are out of scope: only the hot tables are read.
+DEFAULT_STATUSES = ("pending_send",)
+# Written reviews are counted in monthly_category_totals and
+# category_history by triggers that only fire on the move to "written";
+# rewriting them would leave both tables out of step. Dry runs only.
+WRITTEN_STATUSES = ("written",)
+# These already have a Telegram message showing the old suggestion, and
+# approving it reads the suggestion from the database: rewriting it would
+# have the user approve text they never saw.
+ON_TELEGRAM_STATUSES = ("awaiting_user",)
+
+
+def _changed(old: pd.Series, new: pd.Series) -> pd.Series:
+    old, new = old.astype(object), new.astype(object)
+    return ~((old == new) | (old.isna() & new.isna()))
+
+
+def run_reclassify_job(
+    statuses: tuple[str, ...] = DEFAULT_STATUSES, apply: bool = False
+) -> pd.DataFrame:
+    if apply and set(statuses) & set(WRITTEN_STATUSES):
+        raise ValueError(
+            "Written reviews cannot be reclassified with --apply; "
+            "their totals and history are already recorded."
+        )
+    load_dotenv("data/.env")
+    spreadsheet_id = os.getenv("SHEETS_ID")
+    credentials_file = os.getenv("GOOGLE_CREDENTIALS")
+    if not spreadsheet_id or not credentials_file:
+        raise RuntimeError("SHEETS_ID and GOOGLE_CREDENTIALS must be set.")
+
+    sheets = SheetsService(SheetsClient(spreadsheet_id, credentials_file))
+    names_to_nicknames = sheets.get_payment_names()
+    rules = load_rule_table(os.getenv("CLASSIFIER_RULES"), sheets.get_rules())
+
+    with get_connection() as conn:
+        review_repo = ReviewRepository(conn)
+        suggestions = SuggestionIndex.build(review_repo.category_history())
+        cur = review_repo.classification_cursor(statuses)
+        current = pd.DataFrame.from_records(
+            cur.fetchall(), columns=[column[0] for column in cur.description]
+        )
+        if current.empty:
+            return current
+
+        proposed = classify_frame(
+            current, names_to_nicknames, rules, suggestions, PayerIndex(names_to_nicknames)
+        )
+        changed = pd.Series(False, index=current.index)
+        for column in RESULT_COLUMNS:
+            changed |= _changed(current[column], proposed[column])
+
+        changes = current.loc[changed, ["review_id", "mp_id", "status", *RESULT_COLUMNS]]
+        for column in RESULT_COLUMNS:
+            changes[f"new_{column}"] = proposed.loc[changed, column]
+        # Reported but left alone: an existing review cannot become
+        # "ignore", and one on Telegram must match its message.
+        skipped = pd.Series(None, index=changes.index, dtype=object)
+        skipped[changes["new_kind"] == "ignore"] = "would ignore"
+        skipped[changes["status"].isin(ON_TELEGRAM_STATUSES)] = "already on Telegram"
+        changes["skipped"] = skipped
+        changes["applied"] = skipped.isna()
+
+        if apply:
+            rows = changes[changes["applied"]]
+            with review_repo.transaction():
+                review_repo.update_review_suggestions_batch(
+                    zip(
+                        rows["review_id"].astype(int),
+                        rows["new_kind"],
+                        rows["new_suggested_description"],
+                        rows["new_suggested_category"],
+                        rows["new_suggested_nickname"],
+                        rows["new_suggestion_score"],
+                    )
+                )
+        return changes
+
+
+def print_diff(changes: pd.DataFrame, limit: int = 20) -> None:
+    if changes.empty:
+        print("no classification changes")
+        return
+    skipped = changes["skipped"].value_counts()
+    print(
+        f"changed={len(changes)} applicable={int(changes['applied'].sum())} "
+        + " ".join(f"skipped({reason})={count}" for reason, count in skipped.items())
+    )
+    transitions = (
+        changes.assign(
+            old=changes["kind"] + "/" + changes["suggested_category"].fillna("-"),
+            new=changes["new_kind"] + "/" + changes["new_suggested_category"].fillna("-"),
+        )
+        .groupby(["old", "new"])
+        .size()
+        .sort_values(ascending=False)
+    )
+    print("kind/category transitions:")
+    for (old, new), count in transitions.items():
+        print(f"  {old} -> {new}: {count}")
+    print(f"first {min(limit, len(changes))} rows:")
+    for row in changes.head(limit).itertuples(index=False):
+        print(
+            f"  #{row.review_id} [{row.status}] "
+            f"{row.suggested_description!r} -> {row.new_suggested_description!r}"
+            f"{'' if row.applied else f' (skipped: {row.skipped})'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-run the classifier over stored reviews and show what changes."
+    )
+    parser.add_argument(
+        "--status",
+        action="append",
+        help=f"review status to include (repeatable, default: {', '.join(DEFAULT_STATUSES)})",
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="write the changes (default is a dry run)"
+    )
+    parser.add_argument("--limit", type=int, default=20, help="rows shown in the diff")
+    args = parser.parse_args()
+    changes = run_reclassify_job(tuple(args.status or DEFAULT_STATUSES), apply=args.apply)
+    print_diff(changes, args.limit)
+    if not args.apply and not changes.empty:
+        print("dry run: nothing written (use --apply)")
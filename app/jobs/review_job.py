@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import argparse
 import os
 import asyncio
 
@@ -7,12 +8,12 @@ from telegram import Bot
 
 from dotenv import load_dotenv
 
-from app.storage.db import get_connection, init_db
-from app.storage.repo import ReviewRepository, TransactionRepository
+from app.storage.db import get_connection
+from app.storage.repo import ReviewRepository
 from app.telegram.messages import build_review_message
 
 
-async def run_review_job(limit: int = 50) -> int:
+async def run_review_job(limit: int = 50, drain: bool = False) -> int:
     load_dotenv("data/.env")
     token = os.getenv("TELEGRAM_TOKEN")
     chat_id = os.getenv("TELEGRAM_CHAT_ID")
@@ -22,13 +23,15 @@ async def run_review_job(limit: int = 50) -> int:
     bot = Bot(token=token)
 
     with get_connection() as conn:
-        init_db(conn)
         review_repo = ReviewRepository(conn)
-        tx_repo = TransactionRepository(conn)
 
-        reviews = review_repo.list_reviews_by_status("pending_send", limit)
-        for review in reviews:
-            tx = tx_repo.get_transaction(review.mp_id)
+        if drain:
+            reviews = review_repo.iter_reviews_with_transactions("pending_send", limit)
+        else:
+            reviews = review_repo.list_reviews_with_transactions("pending_send", limit)
+        count = 0
+        for review, tx in reviews:
+            count += 1
             if not tx:
                 review_repo.update_review_error(review.id, "Transaction not found.")
                 review_repo.update_review_status(review.id, "failed")
@@ -48,9 +51,15 @@ async def run_review_job(limit: int = 50) -> int:
             review_repo.update_review_telegram(review.id, str(chat_id), str(msg.message_id))
             review_repo.update_review_status(review.id, "awaiting_user")
 
-        return len(reviews)
+        return count
 
 
 if __name__ == "__main__":
-    sent = asyncio.run(run_review_job())
+    parser = argparse.ArgumentParser(description="Send pending reviews to Telegram.")
+    parser.add_argument("--limit", type=int, default=50, help="batch size")
+    parser.add_argument(
+        "--drain", action="store_true", help="send every pending review"
+    )
+    args = parser.parse_args()
+    sent = asyncio.run(run_review_job(args.limit, drain=args.drain))
     print(f"sent={sent}")
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import datetime as dt
 import asyncio
+import os
 import time
 import threading
 import sys
@@ -9,10 +10,15 @@ import sys
 from dotenv import load_dotenv
 
 from app.jobs.classify_job import run_classify_job
+from app.jobs.compact_job import run_compact_job
 from app.jobs.review_job import run_review_job
 from app.jobs.scrape_job import run_scrape_job
 from app.jobs.telegram_bot import run_bot
 from app.jobs.write_job import run_write_job
+from app.metrics.timing import SpanRecorder
+from app.scraper.readiness import ScraperNotReadyError
+from app.scraper.session import BrowserSession
+from app.storage.events import ReviewStatusChanged, bus
 
 def _next_run_at(hour: int, minute: int) -> dt.datetime:
     now = dt.datetime.now()
@@ -22,13 +28,38 @@ def _next_run_at(hour: int, minute: int) -> dt.datetime:
     return candidate
 
 
-def _stdin_watcher(trigger_evt: threading.Event) -> None:
+def _scrape_retry_at(exc: Exception) -> dt.datetime | None:
+    # Rate limiting or a slow /home is transient: retry soon instead of
+    # waiting for the next daily slot.
+    if isinstance(exc, ScraperNotReadyError) and exc.retry_after_s:
+        if exc.result:
+            print(f"[runner] scraper not ready: {exc.result.summary()}")
+        return dt.datetime.now() + dt.timedelta(seconds=exc.retry_after_s)
+    return None
+
+
+def _scrape(session: BrowserSession | None) -> tuple[int, int, str]:
+    recorder = SpanRecorder()
+    try:
+        return run_scrape_job(session=session, recorder=recorder)
+    finally:
+        print(f"[runner] scrape timings:\n{recorder.summary()}")
+
+
+# Approvals wake the loop straight away; the sweep only catches approvals
+# made outside this process (e.g. a standalone bot).
+LOOP_TICK_S = 30
+WRITE_SWEEP_S = 300
+
+
+def _stdin_watcher(trigger_evt: threading.Event, wake_evt: threading.Event) -> None:
     while True:
         line = sys.stdin.readline()
         if not line:
             time.sleep(0.1)
             continue
         trigger_evt.set()
+        wake_evt.set()
 
 
 def main() -> None:
@@ -38,14 +69,35 @@ def main() -> None:
     bot_thread.start()
 
     trigger_evt = threading.Event()
+    write_evt = threading.Event()
+    wake_evt = threading.Event()
     watcher = threading.Thread(
-        target=_stdin_watcher, args=(trigger_evt,), name="RunnerStdinWatcher", daemon=True
+        target=_stdin_watcher,
+        args=(trigger_evt, wake_evt),
+        name="RunnerStdinWatcher",
+        daemon=True,
     )
     watcher.start()
 
+    def _on_review_status(event: ReviewStatusChanged) -> None:
+        if event.status == "approved":
+            write_evt.set()
+            wake_evt.set()
+
+    bus.subscribe(ReviewStatusChanged, _on_review_status)
+
+    session = None
+    if os.getenv("BROWSER_KEEP_WARM") == "1":
+        session = BrowserSession(
+            max_runs=int(os.getenv("BROWSER_MAX_RUNS", "20")),
+            max_memory_growth_mb=float(os.getenv("BROWSER_MAX_MEMORY_GROWTH_MB", "512")),
+        )
+        print("[runner] keeping browser session warm between scrapes")
+
+    retry_at = None
     print("[runner] starting scrape_job on startup")
     try:
-        scraped = run_scrape_job()
+        scraped = _scrape(session)
         print(f"[runner] scrape_job done: {scraped}")
         print("[runner] starting classify_job")
         classified = run_classify_job()
@@ -55,18 +107,22 @@ def main() -> None:
         print(f"[runner] review_job done: sent={sent}")
     except Exception as exc:
         print(f"[runner] startup scrape/classify/review failed: {exc}")
+        retry_at = _scrape_retry_at(exc)
 
-    next_scrape = _next_run_at(22, 0)
+    next_scrape = retry_at or _next_run_at(22, 0)
     print(f"[runner] next scrape at {next_scrape}")
+    next_compact = _next_run_at(4, 0)
+    next_write_sweep = dt.datetime.now()
 
     try:
         while True:
             now = dt.datetime.now()
             if now >= next_scrape or trigger_evt.is_set():
                 trigger_evt.clear()
+                retry_at = None
                 print("[runner] starting scrape_job")
                 try:
-                    scraped = run_scrape_job()
+                    scraped = _scrape(session)
                     print(f"[runner] scrape_job done: {scraped}")
                     print("[runner] starting classify_job")
                     classified = run_classify_job()
@@ -76,19 +132,37 @@ def main() -> None:
                     print(f"[runner] review_job done: sent={sent}")
                 except Exception as exc:
                     print(f"[runner] scrape/classify/review failed: {exc}")
-                next_scrape = _next_run_at(22, 0)
+                    retry_at = _scrape_retry_at(exc)
+                next_scrape = retry_at or _next_run_at(22, 0)
                 print(f"[runner] next scrape at {next_scrape}")
 
-            try:
-                written = run_write_job()
-                if written:
-                    print(f"[runner] write_job done: written={written}")
-            except Exception as exc:
-                print(f"[runner] write job failed: {exc}")
+            if write_evt.is_set() or dt.datetime.now() >= next_write_sweep:
+                write_evt.clear()
+                next_write_sweep = dt.datetime.now() + dt.timedelta(seconds=WRITE_SWEEP_S)
+                try:
+                    written = run_write_job()
+                    if written:
+                        print(f"[runner] write_job done: written={written}")
+                except Exception as exc:
+                    print(f"[runner] write job failed: {exc}")
+
+            if dt.datetime.now() >= next_compact:
+                next_compact = _next_run_at(4, 0)
+                try:
+                    compressed, transactions, reviews, freed = run_compact_job()
+                    print(
+                        f"[runner] compact_job done: archived_transactions={transactions} "
+                        f"archived_reviews={reviews} compressed={compressed} "
+                        f"freed_pages={freed}"
+                    )
+                except Exception as exc:
+                    print(f"[runner] compact job failed: {exc}")
 
-            trigger_evt.wait(timeout=30)
+            wake_evt.wait(timeout=LOOP_TICK_S)
+            wake_evt.clear()
     finally:
-        pass
+        if session is not None:
+            session.close()
 
 
 if __name__ == "__main__":
@@ -1,22 +1,136 @@
 from __future__ import annotations
 
+import argparse
+import contextlib
+import os
+
+from app.domain.models import Transaction
+from app.metrics.timing import SpanRecorder
 from app.scraper.client import MercadoPagoClient
 from app.scraper.service import ScraperService
-from app.storage.db import get_connection, init_db, resolve_db_path
-from app.storage.repo import TransactionRepository
+from app.scraper.session import BrowserSession
+from app.storage.db import get_connection, resolve_db_path
+from app.storage.repo import ScrapeRunRepository, TransactionRepository
+
+# Upper bound for incremental runs. Paging stops earlier at the first row at
+# or older than the stored mark, or at the end of history; only a long gap
+# between runs gets near this many pages. A run that hits it keeps the old
+# mark rather than skip the rows it did not reach.
+INCREMENTAL_MAX_PAGES = 10
+
+STATE_LAST_MP_ID = "scrape.last_mp_id"
+STATE_LAST_OCCURRED_AT = "scrape.last_occurred_at"
+
+
+def _load_high_water_mark(repo: TransactionRepository) -> tuple[str | None, str | None]:
+    last_mp_id = repo.load_state(STATE_LAST_MP_ID)
+    last_occurred_at = repo.load_state(STATE_LAST_OCCURRED_AT)
+    if last_occurred_at:
+        return last_mp_id, last_occurred_at
+    latest = repo.get_latest_transaction()
+    if latest:
+        return latest.mp_id, latest.occurred_at
+    return None, None
+
 
+def _save_high_water_mark(
+    repo: TransactionRepository, txs: list[Transaction], last_occurred_at: str | None
+) -> None:
+    if not txs:
+        return
+    newest = max(txs, key=lambda t: t.occurred_at)
+    if last_occurred_at and newest.occurred_at < last_occurred_at:
+        return
+    repo.save_state(STATE_LAST_MP_ID, newest.mp_id)
+    repo.save_state(STATE_LAST_OCCURRED_AT, newest.occurred_at)
 
-def run_scrape_job(max_pages: int = 1) -> tuple[int, int, str]:
+
+def print_stage_report(last_runs: int = 10) -> None:
+    with get_connection() as conn:
+        rows = ScrapeRunRepository(conn).stage_averages(last_runs)
+    print(f"stage averages over the last {last_runs} successful runs:")
+    for row in rows:
+        rate = f"{row['rows_per_s']:.0f} rows/s" if row["rows_per_s"] else ""
+        print(f"  {row['name']:<24} {row['avg_ms']:>9.0f} ms  x{row['samples']:<4} {rate}")
+
+
+# max_pages=None pages back until the stored high-water mark; an explicit
+# max_pages fetches exactly that many pages (backfill).
+def run_scrape_job(
+    max_pages: int | None = None,
+    strategy: str | None = None,
+    session: BrowserSession | None = None,
+    max_tabs: int | None = None,
+    recorder: SpanRecorder | None = None,
+) -> tuple[int, int, str]:
+    strategy = strategy or os.getenv("SCRAPE_STRATEGY", "dom")
+    max_tabs = max_tabs or int(os.getenv("SCRAPE_MAX_TABS", "1"))
+    recorder = recorder or SpanRecorder()
     with get_connection() as conn:
-        init_db(conn)
         repo = TransactionRepository(conn)
-        with MercadoPagoClient(user_data_dir="data/browser_profile") as client:
-            service = ScraperService(client)
-            txs = service.scrape_transactions(max_pages=max_pages)
-        inserted = repo.insert_transactions(txs)
+        status, error = "ok", None
+        try:
+            known_mp_id, known_occurred_at = None, None
+            if max_pages is None:
+                known_mp_id, known_occurred_at = _load_high_water_mark(repo)
+                # Without a high-water mark there is nothing to page back to.
+                max_pages = INCREMENTAL_MAX_PAGES if known_occurred_at else 1
+
+            with contextlib.ExitStack() as stack:
+                if session is not None:
+                    with recorder.span("browser_launch", "warm session"):
+                        client = stack.enter_context(session.acquire())
+                else:
+                    with recorder.span("browser_launch"):
+                        client = stack.enter_context(
+                            MercadoPagoClient(user_data_dir="data/browser_profile")
+                        )
+                service = ScraperService(
+                    client,
+                    snapshot_dir=os.getenv("SCRAPE_SNAPSHOT_DIR"),
+                    recorder=recorder,
+                )
+                txs, reached_known = service.scrape_transactions(
+                    max_pages=max_pages,
+                    strategy=strategy,
+                    known_mp_id=known_mp_id,
+                    known_occurred_at=known_occurred_at,
+                    max_tabs=max_tabs,
+                )
+            with recorder.span("insert_transactions") as span:
+                inserted = repo.insert_transactions(txs)
+                span.rows = len(txs)
+            if reached_known or not known_occurred_at:
+                _save_high_water_mark(repo, txs, repo.load_state(STATE_LAST_OCCURRED_AT))
+            else:
+                print(
+                    f"[scrape] {max_pages} pages did not reach the stored mark "
+                    f"({known_occurred_at}); keeping it. Run a backfill with "
+                    "--pages to fetch the rows in between."
+                )
+        except Exception as exc:
+            status, error = "failed", str(exc)
+            raise
+        finally:
+            recorder.finish()
+            ScrapeRunRepository(conn).save_run(recorder, status, error)
     return len(txs), inserted, resolve_db_path()
 
 
 if __name__ == "__main__":
-    total, inserted, db_path = run_scrape_job()
+    parser = argparse.ArgumentParser(description="Scrape Mercado Pago movements.")
+    parser.add_argument("--pages", type=int, help="fixed page count (backfill)")
+    parser.add_argument("--tabs", type=int, help="parallel tabs for backfills")
+    parser.add_argument(
+        "--report", action="store_true", help="print recent stage timings and exit"
+    )
+    args = parser.parse_args()
+    if args.report:
+        print_stage_report()
+        raise SystemExit(0)
+    recorder = SpanRecorder()
+    total, inserted, db_path = run_scrape_job(
+        max_pages=args.pages, max_tabs=args.tabs, recorder=recorder
+    )
     print(f"scraped={total} inserted={inserted} db={db_path}")
+    print(recorder.summary())
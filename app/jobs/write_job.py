@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import argparse
 import os
 
 from dotenv import load_dotenv
@@ -7,56 +8,76 @@ from dotenv import load_dotenv
 from app.processing.date_utils import iso_datetime_to_dmy
 from app.sheets.client import SheetsClient
 from app.sheets.service import SheetsService
-from app.storage.db import get_connection, init_db
+from app.storage.db import get_connection
 from app.storage.repo import ReviewRepository, TransactionRepository
 
 
-def run_write_job(limit: int = 50) -> int:
+def run_write_job(limit: int = 50, drain: bool = False) -> int:
     load_dotenv("data/.env")
     spreadsheet_id = os.getenv("SHEETS_ID")
     credentials_file = os.getenv("GOOGLE_CREDENTIALS")
     if not spreadsheet_id or not credentials_file:
         raise RuntimeError("SHEETS_ID and GOOGLE_CREDENTIALS must be set.")
 
-    sheets = SheetsService(SheetsClient(spreadsheet_id, credentials_file))
-
     with get_connection() as conn:
-        init_db(conn)
         review_repo = ReviewRepository(conn)
         tx_repo = TransactionRepository(conn)
 
-        reviews = review_repo.list_reviews_by_status("approved", limit)
-        for review in reviews:
-            tx = tx_repo.get_transaction(review.mp_id)
+        # Opening Sheets costs several API calls; skip it on idle sweeps.
+        if not review_repo.has_reviews_with_status("approved"):
+            return 0
+        sheets = SheetsService(SheetsClient(spreadsheet_id, credentials_file))
+
+        if drain:
+            reviews = review_repo.iter_reviews_with_transactions("approved", limit)
+        else:
+            reviews = review_repo.list_reviews_with_transactions("approved", limit)
+        count = 0
+        for review, tx in reviews:
+            count += 1
             if not tx:
-                review_repo.update_review_error(review.id, "Transaction not found.")
-                review_repo.update_review_status(review.id, "failed")
+                with review_repo.transaction():
+                    review_repo.update_review_error(review.id, "Transaction not found.")
+                    review_repo.update_review_status(review.id, "failed")
                 continue
 
             date_dmy = iso_datetime_to_dmy(tx.occurred_at)
             if review.kind == "deposit":
                 nickname = review.final_nickname or review.suggested_nickname
                 if not nickname:
-                    review_repo.update_review_error(review.id, "Missing nickname.")
-                    review_repo.update_review_status(review.id, "failed")
+                    with review_repo.transaction():
+                        review_repo.update_review_error(review.id, "Missing nickname.")
+                        review_repo.update_review_status(review.id, "failed")
                     continue
                 sheets.insert_deposit(nickname, date_dmy, tx.amount)
             else:
                 description = review.final_description or review.suggested_description
                 category = review.final_category or review.suggested_category
                 if not description or not category:
-                    review_repo.update_review_error(review.id, "Missing description/category.")
-                    review_repo.update_review_status(review.id, "failed")
+                    with review_repo.transaction():
+                        review_repo.update_review_error(
+                            review.id, "Missing description/category."
+                        )
+                        review_repo.update_review_status(review.id, "failed")
                     continue
                 amount = tx.amount if tx.direction == "out" else -tx.amount
                 sheets.insert_spent(date_dmy, amount, description, category)
 
-            review_repo.update_review_status(review.id, "written")
-            tx_repo.set_status(tx.mp_id, "sent")
+            # Commit per row, right after its Sheets write: batching these
+            # would re-append already written rows if the process died mid-batch.
+            with review_repo.transaction():
+                review_repo.update_review_status(review.id, "written")
+                tx_repo.set_status(tx.mp_id, "sent")
 
-        return len(reviews)
+        return count
 
 
 if __name__ == "__main__":
-    count = run_write_job()
+    parser = argparse.ArgumentParser(description="Write approved reviews to Sheets.")
+    parser.add_argument("--limit", type=int, default=50, help="batch size")
+    parser.add_argument(
+        "--drain", action="store_true", help="write every approved review"
+    )
+    args = parser.parse_args()
+    count = run_write_job(args.limit, drain=args.drain)
     print(f"written={count}")
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+
+@dataclass
+class Span:
+    name: str
+    elapsed_ms: float = 0.0
+    rows: int | None = None
+    detail: str | None = None
+
+    @property
+    def rows_per_s(self) -> float | None:
+        if self.rows is None or self.elapsed_ms <= 0:
+            return None
+        return self.rows / (self.elapsed_ms / 1000)
+
+
+class SpanRecorder:
+    def __init__(self) -> None:
+        self.started_at = datetime.now()
+        self.spans: list[Span] = []
+        self._started = time.perf_counter()
+        self._finished: float | None = None
+
+    def finish(self) -> None:
+        if self._finished is None:
+            self._finished = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name: str, detail: str | None = None) -> Iterator[Span]:
+        span = Span(name=name, detail=detail)
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.elapsed_ms = (time.perf_counter() - started) * 1000
+            self.spans.append(span)
+
+    @property
+    def total_ms(self) -> float:
+        # Wall time of the run. Spans can nest (tab windows around page
+        # loads), so their sum would overstate it.
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return (end - self._started) * 1000
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<24} {'ms':>9} {'rows':>6} {'rows/s':>9}  detail"]
+        for span in self.spans:
+            rows = "" if span.rows is None else str(span.rows)
+            rate = "" if span.rows_per_s is None else f"{span.rows_per_s:.0f}"
+            lines.append(
+                f"{span.name:<24} {span.elapsed_ms:>9.0f} {rows:>6} {rate:>9}  {span.detail or ''}"
+            )
+        lines.append(f"{'total':<24} {self.total_ms:>9.0f}")
+        return "\n".join(lines)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from app.processing.name_utils import encode_name
+from app.processing.payer_index import PayerIndex
+from app.processing.rules import DEPOSIT_PREFIXES, FallbackRule, RuleTable, default_rule_table
+from app.processing.suggestions import SuggestionIndex
+
+# Columnar version of rules.classify_transaction for reprocessing history.
+# Input columns: description_primary, description_secondary, amount,
+# direction and optionally counterparty_key. Output columns: kind,
+# suggested_description, suggested_category, suggested_nickname,
+# suggestion_score. Results
+# match the per-row classifier exactly (benchmarks/bulk_classifier.py checks).
+#
+# The result only depends on the descriptions, the direction and which
+# min_amount thresholds the amount clears, so each distinct combination is
+# classified once and the result is broadcast back to every row.
+
+RESULT_COLUMNS = [
+    "kind",
+    "suggested_description",
+    "suggested_category",
+    "suggested_nickname",
+    "suggestion_score",
+]
+
+
+def _fallback_mask(
+    rule: FallbackRule, frame: pd.DataFrame, names_to_nicknames: dict[str, str]
+) -> pd.Series:
+    mask = pd.Series(True, index=frame.index)
+    if rule.primary_prefix is not None:
+        mask &= frame["description_primary"].str.startswith(rule.primary_prefix)
+    if rule.counterparty_pattern is not None:
+        mask &= frame["counterparty_key"].str.contains(rule.counterparty_pattern, regex=True)
+    if rule.min_amount is not None:
+        mask &= frame["amount"] >= rule.min_amount
+    if rule.known_payer:
+        mask &= frame["counterparty_key"].isin(names_to_nicknames.keys())
+    return mask
+
+
+def _format_fallback(rule: FallbackRule, frame: pd.DataFrame) -> pd.Series | str:
+    if "{" not in rule.description:
+        return rule.description
+    return pd.Series(
+        [
+            rule.description.format(primary=primary, counterparty=counterparty)
+            for primary, counterparty in zip(
+                frame["description_primary"], frame["description_secondary"]
+            )
+        ],
+        index=frame.index,
+        dtype=object,
+    )
+
+
+def _classify_spent(
+    frame: pd.DataFrame,
+    names_to_nicknames: dict[str, str],
+    rules: RuleTable,
+    suggestions: SuggestionIndex | None,
+) -> tuple[pd.Series, pd.Series, pd.Series]:
+    description = pd.Series(None, index=frame.index, dtype=object)
+    category = pd.Series(None, index=frame.index, dtype=object)
+    score = pd.Series(None, index=frame.index, dtype=object)
+
+    # Exact rules: one hash join on (description_primary, counterparty_key).
+    exact = pd.DataFrame(
+        [
+            (primary, key, rule.description, rule.category)
+            for (primary, key), rule in rules.exact.items()
+            if rule.description is not None
+        ],
+        columns=["description_primary", "counterparty_key", "_description", "_category"],
+    )
+    joined = frame[["description_primary", "counterparty_key"]].merge(
+        exact, how="left", on=["description_primary", "counterparty_key"]
+    )
+    joined.index = frame.index
+    matched = joined["_description"].notna()
+    description[matched] = joined.loc[matched, "_description"]
+    category[matched] = joined.loc[matched, "_category"]
+
+    # Fallbacks, in the same order as RuleTable.classify_spent: those bound
+    # to the row's primary first, then the generic ones.
+    pending = ~matched
+    for primary in frame.loc[pending, "description_primary"].unique():
+        for rule in rules.fallbacks_by_primary.get(primary, ()):
+            rows = pending & (frame["description_primary"] == primary)
+            if not rows.any():
+                break
+            hit = rows & _fallback_mask(rule, frame, names_to_nicknames)
+            if hit.any():
+                description[hit] = _format_fallback(rule, frame[hit])
+                category[hit] = rule.category
+                pending &= ~hit
+    for rule in rules.generic_fallbacks:
+        if not pending.any():
+            break
+        hit = pending & _fallback_mask(rule, frame, names_to_nicknames)
+        if hit.any():
+            description[hit] = _format_fallback(rule, frame[hit])
+            category[hit] = rule.category
+            pending &= ~hit
+
+    description[pending] = (
+        frame.loc[pending, "description_primary"]
+        + ": "
+        + frame.loc[pending, "description_secondary"]
+    )
+
+    # History suggestions for rows no rule gave a category. Frames reaching
+    # here hold one row per distinct counterparty, so a plain loop is fine.
+    if suggestions is not None:
+        for row, key in frame.loc[category.isna(), "counterparty_key"].items():
+            suggestion = suggestions.suggest(key)
+            if suggestion is not None:
+                description[row] = suggestion.description
+                category[row] = suggestion.category
+                score[row] = suggestion.score
+    return description, category, score
+
+
+def _amount_buckets(frame: pd.DataFrame, rules: RuleTable) -> np.ndarray:
+    fallbacks = [
+        *(rule for group in rules.fallbacks_by_primary.values() for rule in group),
+        *rules.generic_fallbacks,
+    ]
+    thresholds = sorted({rule.min_amount for rule in fallbacks if rule.min_amount is not None})
+    return np.searchsorted(thresholds, frame["amount"].to_numpy(dtype=float), side="right")
+
+
+def classify_frame(
+    frame: pd.DataFrame,
+    names_to_nicknames: dict[str, str],
+    rules: RuleTable | None = None,
+    suggestions: SuggestionIndex | None = None,
+    payers: PayerIndex | None = None,
+) -> pd.DataFrame:
+    rules = rules or default_rule_table()
+    if frame.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS, index=frame.index, dtype=object)
+
+    key_columns = ["description_primary", "description_secondary", "direction"]
+    keys = frame[key_columns].assign(_bucket=_amount_buckets(frame, rules))
+    codes = keys.groupby([*key_columns, "_bucket"], sort=False, dropna=False).ngroup()
+    codes = codes.to_numpy()
+    _, first_rows = np.unique(codes, return_index=True)
+
+    unique = frame.iloc[first_rows].reset_index(drop=True)
+    classified = _classify_unique(unique, names_to_nicknames, rules, suggestions, payers)
+    result = classified.iloc[codes]
+    result.index = frame.index
+    return result
+
+
+def _classify_unique(
+    frame: pd.DataFrame,
+    names_to_nicknames: dict[str, str],
+    rules: RuleTable,
+    suggestions: SuggestionIndex | None,
+    payers: PayerIndex | None,
+) -> pd.DataFrame:
+    frame = frame.copy()
+    if "counterparty_key" not in frame:
+        frame["counterparty_key"] = None
+    missing_key = frame["counterparty_key"].isna()
+    if missing_key.any():
+        frame.loc[missing_key, "counterparty_key"] = frame.loc[
+            missing_key, "description_secondary"
+        ].map(encode_name)
+
+    result = pd.DataFrame(
+        {column: pd.Series(None, index=frame.index, dtype=object) for column in RESULT_COLUMNS}
+    )
+    result["kind"] = "ignore"
+
+    desc1 = frame["description_primary"]
+    income = desc1 == "Rendimentos"
+
+    if payers is not None:
+        payer = frame["counterparty_key"].map(payers.match)
+        nickname = payer.map(lambda match: match.nickname if match else None)
+        payer_score = payer.map(lambda match: match.score if match else None)
+    else:
+        nickname = frame["counterparty_key"].map(names_to_nicknames)
+        payer_score = pd.Series(1.0, index=frame.index, dtype=object)
+    deposit = (
+        ~income
+        & (frame["direction"] == "in")
+        & desc1.isin(DEPOSIT_PREFIXES)
+        & nickname.notna()
+        & (nickname != "")
+    )
+    result.loc[deposit, "kind"] = "deposit"
+    result.loc[deposit, "suggested_description"] = "Depósito na conta da casa"
+    result.loc[deposit, "suggested_category"] = "Depósito"
+    result.loc[deposit, "suggested_nickname"] = nickname[deposit]
+    result.loc[deposit, "suggestion_score"] = payer_score[deposit]
+
+    spent = ~income & ~deposit & frame["direction"].isin(["in", "out"])
+    if spent.any():
+        description, category, score = _classify_spent(
+            frame[spent], names_to_nicknames, rules, suggestions
+        )
+        # A "Rendimento" category means the row is income, not an expense.
+        spent_rows = spent.copy()
+        spent_rows[spent] = category.ne("Rendimento").to_numpy()
+        result.loc[spent_rows, "kind"] = "spent"
+        result.loc[spent_rows, "suggested_description"] = description[spent_rows[spent]]
+        result.loc[spent_rows, "suggested_category"] = category[spent_rows[spent]]
+        result.loc[spent_rows, "suggestion_score"] = score[spent_rows[spent]]
+
+    return result
@@ -3,7 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from app.domain.models import Transaction
-from app.processing.rules import Classification, classify_transaction
+from app.processing.payer_index import PayerIndex
+from app.processing.rules import Classification, RuleTable, classify_transaction
+from app.processing.suggestions import SuggestionIndex
 
 
 @dataclass(frozen=True)
@@ -13,9 +15,15 @@ class ClassifiedTransaction:
 
 
 def classify_transactions(
-    transactions: list[Transaction], names_to_nicknames: dict[str, str]
+    transactions: list[Transaction],
+    names_to_nicknames: dict[str, str],
+    rules: RuleTable | None = None,
+    suggestions: SuggestionIndex | None = None,
+    payers: PayerIndex | None = None,
 ) -> list[ClassifiedTransaction]:
     return [
-        ClassifiedTransaction(t, classify_transaction(t, names_to_nicknames))
+        ClassifiedTransaction(
+            t, classify_transaction(t, names_to_nicknames, rules, suggestions, payers)
+        )
         for t in transactions
     ]
@@ -1,8 +1,103 @@
 from __future__ import annotations
 
-from datetime import datetime
+import re
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+MONTHS_PT = {
+    "janeiro": 1,
+    "fevereiro": 2,
+    "marco": 3,
+    "março": 3,
+    "abril": 4,
+    "maio": 5,
+    "junho": 6,
+    "julho": 7,
+    "agosto": 8,
+    "setembro": 9,
+    "outubro": 10,
+    "novembro": 11,
+    "dezembro": 12,
+}
+MONTHS_PT.update({name[:3]: number for name, number in list(MONTHS_PT.items())})
+
+RELATIVE_DAYS_PT = {"hoje": 0, "ontem": 1, "anteontem": 2}
+
+# "12 de março", "sexta-feira, 12 de março", "25 de out.", "12 de março de 2024"
+_DAY_MONTH_RE = re.compile(
+    r"^(?:[a-zçá-]+,\s*)?(?P<day>\d{1,2}) de (?P<month>[a-zç]+)\.?(?: de (?P<year>\d{4}))?$"
+)
+_NUMERIC_RE = re.compile(r"^(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})$")
+
+_dateparser = None
 
 
 def iso_datetime_to_dmy(iso_dt: str) -> str:
     dt = datetime.strptime(iso_dt, "%Y-%m-%d %H:%M")
     return dt.strftime("%d/%m/%Y")
+
+
+def _parse_with_dateparser(text: str, reference: datetime) -> date | None:
+    # dateparser takes about a second to import, so it only loads the first
+    # time a header falls outside the fast path.
+    global _dateparser
+    if _dateparser is None:
+        import dateparser
+
+        _dateparser = dateparser
+    dt = _dateparser.parse(
+        text,
+        languages=["pt"],
+        settings={
+            "TIMEZONE": "UTC",
+            "RETURN_AS_TIMEZONE_AWARE": False,
+            "RELATIVE_BASE": reference,
+        },
+    )
+    return dt.date() if dt is not None else None
+
+
+def _fast_path(text: str, reference_day: date) -> date | None:
+    if text in RELATIVE_DAYS_PT:
+        return reference_day - timedelta(days=RELATIVE_DAYS_PT[text])
+
+    match = _DAY_MONTH_RE.match(text)
+    if match:
+        month = MONTHS_PT.get(match["month"])
+        if month is None:
+            return None
+        # Like dateparser, a missing year means the reference year.
+        year = int(match["year"]) if match["year"] else reference_day.year
+        try:
+            return date(year, month, int(match["day"]))
+        except ValueError:
+            return None
+
+    match = _NUMERIC_RE.match(text)
+    if match:
+        try:
+            return date(int(match["year"]), int(match["month"]), int(match["day"]))
+        except ValueError:
+            return None
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _resolve(text: str, reference_day: date) -> date | None:
+    resolved = _fast_path(text, reference_day)
+    if resolved is not None:
+        return resolved
+    reference = datetime.combine(reference_day, datetime.min.time())
+    return _parse_with_dateparser(text, reference)
+
+
+def resolve_relative_date(date_text: str, reference: datetime | None = None) -> str:
+    if reference is None:
+        # The scraper has always resolved headers against the UTC clock
+        # (dateparser TIMEZONE=UTC); keep that so mp_ids stay stable.
+        reference = datetime.now(timezone.utc).replace(tzinfo=None)
+    text = " ".join(date_text.split()).lower()
+    resolved = _resolve(text, reference.date())
+    if resolved is None:
+        raise ValueError("Date parsing failed.")
+    return resolved.strftime("%Y-%m-%d")
@@ -1,6 +1,10 @@
 import unicodedata
+from functools import lru_cache
 
 
+# Counterparties and payer names repeat across runs; bounded so a long-lived
+# runner does not grow without limit.
+@lru_cache(maxsize=4096)
 def encode_name(name: str) -> str:
     nfkd = unicodedata.normalize("NFKD", name.strip())
     only_ascii = nfkd.encode("ASCII", "ignore").decode("ASCII")
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.processing.similarity import TrigramIndex, trigrams, words
+
+# Inexact matches never report certainty, so the bot always flags them.
+MAX_INEXACT_SCORE = 0.99
+
+
+@dataclass(frozen=True)
+class PayerMatch:
+    nickname: str
+    # 1.0 for an exact name from the sheet, else the trigram similarity
+    # (which only ranks candidates) capped at MAX_INEXACT_SCORE.
+    score: float
+
+
+class PayerIndex:
+    # Payer names from the config sheet (encode_name form), matched exactly
+    # first, then as a truncated or reordered form of a sheet name (see
+    # _is_truncated_or_reordered), so "marcos pereira" or "silva marcos
+    # pereira" still find "marcos pereira da silva". Trigram candidates keep
+    # the lookup off the full name list. Built once per classify run.
+    def __init__(self, names_to_nicknames: dict[str, str]) -> None:
+        self._nicknames = {name: nick for name, nick in names_to_nicknames.items() if nick}
+        self._names = TrigramIndex(self._nicknames)
+
+    def __len__(self) -> int:
+        return len(self._nicknames)
+
+    def match(self, counterparty_key: str) -> PayerMatch | None:
+        nickname = self._nicknames.get(counterparty_key)
+        if nickname is not None:
+            return PayerMatch(nickname, 1.0)
+        return self._nearest(counterparty_key)
+
+    def _nearest(self, counterparty_key: str) -> PayerMatch | None:
+        # A word cut short loses only its last padded trigram ("il " in
+        # "sil"), so a name that fits shares all but one per word; fewer
+        # shared trigrams rule a candidate out before the word check.
+        min_shared = len(trigrams(counterparty_key)) - len(words(counterparty_key))
+        found = [
+            (name, score)
+            for name, score in self._names.matches(counterparty_key, min_shared=min_shared)
+            if _is_truncated_or_reordered(counterparty_key, name)
+        ]
+        if not found:
+            return None
+        # A short name can fit several residents ("marcos pereira" for two
+        # Marcos Pereiras); the closer one is still a guess, so leave it to
+        # the user.
+        nicknames = {self._nicknames[name] for name, _ in found}
+        if len(nicknames) > 1:
+            return None
+        _, score = found[0]
+        return PayerMatch(nicknames.pop(), min(score, MAX_INEXACT_SCORE))
+
+
+def _is_truncated_or_reordered(counterparty_key: str, name: str) -> bool:
+    # Bank statements cut long names and sometimes reorder them, but never
+    # change a word: every word of the transfer must be a distinct word of
+    # the sheet name or its prefix, in any order. Otherwise "joao carlos
+    # silva" would pay for "jose carlos silva".
+    query = words(counterparty_key)
+    return bool(query) and _assign_words(query, words(name))
+
+
+def _assign_words(query: list[str], target: list[str]) -> bool:
+    # Names are a handful of words, so trying every assignment is cheap.
+    if not query:
+        return True
+    word, rest = query[0], query[1:]
+    return any(
+        candidate.startswith(word) and _assign_words(rest, target[:i] + target[i + 1 :])
+        for i, candidate in enumerate(target)
+    )
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import json
+import re
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
 
 from app.domain.models import Transaction
 from app.processing.name_utils import encode_name
+from app.processing.payer_index import PayerIndex, PayerMatch
+from app.processing.suggestions import SuggestionIndex
 
 DEPOSIT_PREFIXES = {"Transferência Pix recebida", "Transferência recebida"}
 
+# Merchant rules live in this file (and optionally a "Regras" Sheets tab)
+# instead of code; see RuleTable.
+DEFAULT_RULES_PATH = Path(__file__).with_name("rules.json")
+
 
 @dataclass(frozen=True)
 class Classification:
@@ -14,94 +25,136 @@ class Classification:
     suggested_description: str | None
     suggested_category: str | None
     suggested_nickname: str | None
+    # Deposits: payer-name match score. Spent: set when the suggestion came
+    # from history rather than a rule.
+    score: float | None = None
 
 
-def _classify_spent(
-    desc1: str, desc2: str, amount: float, names_to_nicknames: dict[str, str]
-) -> tuple[str | None, str | None]:
-    description = None
-    category = None
+@dataclass(frozen=True)
+class SpentRule:
+    description: str | None
+    category: str | None
 
-    desc2_enc = encode_name(desc2)
 
-    if desc1 == "Dinheiro reservado":
-        if desc2_enc == "13 oseias":
-            description = "Reservado para 13° Oséias"
-            category = "Oséas"
-        else:
-            description = f"Reservado em '{desc2}'"
-            category = "Caixinha"
-    elif desc1 == "Dinheiro retirado":
-        if desc2_enc == "13 oseias":
-            description = "Retidado para 13° Oséias"
-            category = "Oséas"
-        else:
-            description = f"Retirado de '{desc2}'"
-            category = "Caixinha"
-    elif desc1 == "Transferência enviada":
-        if desc2_enc == "tenda atacado sa":
-            description = "Compra tenda"
-            category = "Mercado geral"
-    elif desc1 == "Transferência Pix enviada":
-        if desc2_enc == "oseas dias da silva selvagio":
-            description = "Salário Oséas"
-            category = "Oséas"
-        elif desc2_enc == "walterdisney lima santos":
-            description = "Pagamento vigia"
-            category = "Vigia"
-    elif desc1 == "Pagamento com QR Pix":
-        if desc2_enc == "tenda atacado sa":
-            description = "Compra tenda"
-            category = "Mercado geral"
-        elif desc2_enc == "companhia paulista de forca e luz":
-            description = "Pagamento conta de luz"
-            category = "Luz"
-        elif desc2_enc == "telefonica brasil s a":
-            description = "Pagamento conta de internet"
-            category = "Internet"
-        elif desc2_enc == "supermercados jau serve ltda":
-            description = "o que foi comprado no jau?"
-    elif desc1 == "Pagamento":
-        if desc2_enc == "varejao passarinh":
-            description = "compra no passarinho"
-            category = "Mercado geral"
-        elif desc2_enc == "jau serve lj 32":
-            description = "o que foi comprado no jau?"
-    elif desc1 == "Reserva programada":
-        if desc2_enc == "13 oseias":
-            description = "Reservado para 13° Oséias"
-            category = "Oséas"
-    elif desc1 == "Pagamento de contas":
-        if desc2_enc == "saae sao carlos sp":
-            description = "Pagamento conta de água"
-            category = "Água"
-        elif desc2_enc == "rfb - doc arrec emp":
-            description = "Imposrto oséias"
-            category = "Oséas"
-        elif desc2_enc == "vivo movel sp":
-            description = "Pagamento conta de internet"
-            category = "Internet"
-        elif desc2_enc == "cpfl paulista":
-            description = "Pagamento conta de luz"
-            category = "Luz"
-
-    if description is None:
-        if desc1 in {"Transferência enviada", "Transferência Pix enviada"}:
-            if desc2_enc in names_to_nicknames and amount >= 3000:
-                description = "Para sacar aluguel"
-                category = "Aluguel marcos"
-
-    if description is None:
-        description = f"{desc1}: {desc2}"
-
-    return description, category
+@dataclass(frozen=True)
+class FallbackRule:
+    # Applies when no exact (description_primary, counterparty) rule matched.
+    # Templates may use {primary} and {counterparty} (the raw secondary text).
+    description: str
+    category: str | None
+    primaries: frozenset[str] = frozenset()
+    primary_prefix: str | None = None
+    counterparty_pattern: re.Pattern | None = None
+    min_amount: float | None = None
+    known_payer: bool = False
+
+    @classmethod
+    def from_config(cls, entry: dict) -> "FallbackRule":
+        pattern = entry.get("counterparty_regex")
+        return cls(
+            description=entry["description"],
+            category=entry.get("category"),
+            primaries=frozenset(entry.get("primary", ())),
+            primary_prefix=entry.get("primary_prefix"),
+            counterparty_pattern=re.compile(pattern) if pattern else None,
+            min_amount=entry.get("min_amount"),
+            known_payer=bool(entry.get("known_payer", False)),
+        )
+
+    def matches(
+        self, desc1: str, desc2_enc: str, amount: float, names_to_nicknames: dict[str, str]
+    ) -> bool:
+        if self.primary_prefix is not None and not desc1.startswith(self.primary_prefix):
+            return False
+        if self.counterparty_pattern is not None and not self.counterparty_pattern.search(
+            desc2_enc
+        ):
+            return False
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        if self.known_payer and desc2_enc not in names_to_nicknames:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class RuleTable:
+    exact: dict[tuple[str, str], SpentRule]
+    # Fallbacks listing primaries are indexed by them; the rest are tried
+    # afterwards, in file order.
+    fallbacks_by_primary: dict[str, tuple[FallbackRule, ...]]
+    generic_fallbacks: tuple[FallbackRule, ...]
+
+    @classmethod
+    def compile(cls, config: dict, extra_exact: Iterable[dict] = ()) -> "RuleTable":
+        # Later exact rules win, so extra_exact (e.g. the Sheets tab)
+        # overrides the file.
+        exact: dict[tuple[str, str], SpentRule] = {}
+        for entry in [*config.get("exact", ()), *extra_exact]:
+            key = (entry["primary"], encode_name(entry["counterparty"]))
+            exact[key] = SpentRule(entry.get("description"), entry.get("category"))
+
+        by_primary: dict[str, list[FallbackRule]] = {}
+        generic: list[FallbackRule] = []
+        for entry in config.get("fallbacks", ()):
+            rule = FallbackRule.from_config(entry)
+            if rule.primaries:
+                for primary in rule.primaries:
+                    by_primary.setdefault(primary, []).append(rule)
+            else:
+                generic.append(rule)
+        return cls(
+            exact=exact,
+            fallbacks_by_primary={k: tuple(v) for k, v in by_primary.items()},
+            generic_fallbacks=tuple(generic),
+        )
+
+    def classify_spent(
+        self,
+        desc1: str,
+        desc2: str,
+        amount: float,
+        names_to_nicknames: dict[str, str],
+        desc2_enc: str | None = None,
+    ) -> tuple[str | None, str | None]:
+        if desc2_enc is None:
+            desc2_enc = encode_name(desc2)
+
+        rule = self.exact.get((desc1, desc2_enc))
+        if rule is not None and rule.description is not None:
+            return rule.description, rule.category
+
+        for fallback in (*self.fallbacks_by_primary.get(desc1, ()), *self.generic_fallbacks):
+            if fallback.matches(desc1, desc2_enc, amount, names_to_nicknames):
+                description = fallback.description.format(primary=desc1, counterparty=desc2)
+                return description, fallback.category
+
+        return f"{desc1}: {desc2}", None
+
+
+def load_rule_table(
+    path: str | Path | None = None, extra_exact: Iterable[dict] = ()
+) -> RuleTable:
+    path = Path(path) if path else DEFAULT_RULES_PATH
+    config = json.loads(path.read_text(encoding="utf-8"))
+    return RuleTable.compile(config, extra_exact)
+
+
+@lru_cache(maxsize=1)
+def default_rule_table() -> RuleTable:
+    return load_rule_table()
 
 
 def classify_transaction(
-    transaction: Transaction, names_to_nicknames: dict[str, str]
+    transaction: Transaction,
+    names_to_nicknames: dict[str, str],
+    rules: RuleTable | None = None,
+    suggestions: SuggestionIndex | None = None,
+    payers: PayerIndex | None = None,
 ) -> Classification:
     desc1 = transaction.description_primary
     desc2 = transaction.description_secondary
+    desc2_enc = transaction.counterparty_key or encode_name(desc2)
 
     if desc1 == "Rendimentos":
         return Classification(
@@ -112,28 +165,42 @@ def classify_transaction(
         )
 
     if transaction.direction == "in" and desc1 in DEPOSIT_PREFIXES:
-        encoded = encode_name(desc2)
-        nickname = names_to_nicknames.get(encoded)
-        if nickname:
+        if payers is not None:
+            payer = payers.match(desc2_enc)
+        else:
+            nickname = names_to_nicknames.get(desc2_enc)
+            payer = PayerMatch(nickname, 1.0) if nickname else None
+        if payer is not None:
             return Classification(
                 kind="deposit",
                 suggested_description="Depósito na conta da casa",
                 suggested_category="Depósito",
-                suggested_nickname=nickname,
+                suggested_nickname=payer.nickname,
+                score=payer.score,
             )
 
     if transaction.direction in {"in", "out"}:
-        description, category = _classify_spent(
+        description, category = (rules or default_rule_table()).classify_spent(
             desc1=desc1,
             desc2=desc2,
             amount=transaction.amount,
             names_to_nicknames=names_to_nicknames,
+            desc2_enc=desc2_enc,
         )
+        score = None
+        # No rule settled the category: fall back to how this counterparty
+        # was written before.
+        if category is None and suggestions is not None:
+            suggestion = suggestions.suggest(desc2_enc)
+            if suggestion is not None:
+                description, category = suggestion.description, suggestion.category
+                score = suggestion.score
         classification = Classification(
             kind="spent",
             suggested_description=description,
             suggested_category=category,
             suggested_nickname=None,
+            score=score,
         )
         if classification.suggested_category == "Rendimento":
             return Classification(
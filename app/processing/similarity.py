@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+
+_WORD_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def words(text: str) -> list[str]:
+    # Expects encode_name() output.
+    return [word for word in _WORD_SPLIT.split(text) if word]
+
+
+def trigrams(text: str) -> frozenset[str]:
+    # Trigrams are taken per word (padded, so short words and word starts
+    # count), which makes reordered words match.
+    grams: set[str] = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    # Inverted index from trigram to the keys containing it, so a lookup only
+    # scores keys sharing at least one trigram with the query instead of
+    # comparing against every key. Scores are Dice coefficients: 1.0 for the
+    # same words in any order.
+    def __init__(self, keys=()) -> None:
+        self._keys: list[str] = []
+        self._sizes: list[int] = []
+        self._positions: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = {}
+        # Lookups repeat for the same counterparty within a classify run and
+        # the indexes built on this one only live that long, so the memo
+        # needs no bound; add() clears it.
+        self._memo: dict[tuple[str, float, int], list[tuple[str, float]]] = {}
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def add(self, key: str) -> None:
+        if key in self._positions:
+            return
+        self._memo.clear()
+        grams = trigrams(key)
+        position = len(self._keys)
+        self._positions[key] = position
+        self._keys.append(key)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(position)
+
+    def matches(
+        self, text: str, min_score: float = 0.0, min_shared: int = 1
+    ) -> list[tuple[str, float]]:
+        # Keys with a Dice score at or above min_score and at least
+        # min_shared trigrams in common with text, best first; ties go to the
+        # smaller key so results do not depend on insertion order.
+        memo_key = (text, min_score, min_shared)
+        found = self._memo.get(memo_key)
+        if found is None:
+            found = self._memo[memo_key] = self._score(text, min_score, min_shared)
+        return list(found)
+
+    def _score(self, text: str, min_score: float, min_shared: int) -> list[tuple[str, float]]:
+        grams = trigrams(text)
+        if not grams:
+            return []
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        found = []
+        for position, count in shared.items():
+            if count < min_shared:
+                continue
+            score = 2 * count / (len(grams) + self._sizes[position])
+            if score >= min_score:
+                found.append((self._keys[position], score))
+        found.sort(key=lambda match: (-match[1], match[0]))
+        return found
+
+    def best_match(self, text: str, min_score: float = 0.0) -> tuple[str, float] | None:
+        if text in self._positions:
+            return text, 1.0
+        found = self.matches(text, min_score)
+        return found[0] if found else None
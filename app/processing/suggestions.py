@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from app.processing.similarity import TrigramIndex
+
+# Below this trigram similarity a neighbouring counterparty is not trusted.
+MIN_SIMILARITY = 0.6
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    description: str
+    category: str
+    # Confidence in [0, 1): how consistently this counterparty was written
+    # with this label, scaled by the name similarity for fuzzy matches.
+    score: float
+
+
+class SuggestionIndex:
+    # Description/category pairs from reviews already written to the sheet,
+    # keyed on the counterparty (encode_name form). Built once per classify
+    # run from the category_history table, which a trigger keeps current.
+    def __init__(self, min_similarity: float = MIN_SIMILARITY) -> None:
+        self.min_similarity = min_similarity
+        self._best: dict[str, Suggestion] = {}
+        self._names = TrigramIndex()
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[tuple[str, str, str, int]],
+        min_similarity: float = MIN_SIMILARITY,
+    ) -> "SuggestionIndex":
+        # rows: (counterparty_key, description, category, count), most
+        # recently written first so ties go to the newer label.
+        totals: dict[str, int] = {}
+        best: dict[str, tuple[str, str, int]] = {}
+        for key, description, category, count in rows:
+            totals[key] = totals.get(key, 0) + count
+            if key not in best or count > best[key][2]:
+                best[key] = (description, category, count)
+
+        index = cls(min_similarity)
+        for key, (description, category, count) in best.items():
+            # The +1 keeps a single written review from reading as certain.
+            index._best[key] = Suggestion(description, category, count / (totals[key] + 1))
+            index._names.add(key)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._best)
+
+    def suggest(self, counterparty_key: str) -> Suggestion | None:
+        exact = self._best.get(counterparty_key)
+        if exact is not None:
+            return exact
+        match = self._names.best_match(counterparty_key, self.min_similarity)
+        if match is None:
+            return None
+        key, similarity = match
+        best = self._best[key]
+        return Suggestion(best.description, best.category, best.score * similarity)
@@ -1,8 +1,30 @@
 from __future__ import annotations
 
+import contextlib
+from pathlib import Path
+
+import psutil
 from playwright.sync_api import sync_playwright
 
-import time
+from app.scraper.parser import DAYS_SELECTOR
+from app.scraper.readiness import (
+    RATE_LIMIT_SELECTOR,
+    RateLimitedError,
+    ReadinessPolicy,
+    ReadinessResult,
+    wait_for_state,
+    wait_until_ready,
+)
+from app.scraper.routing import PageLoadStats, ResourceBlocker
+
+# The movements list renders well before images, fonts and trackers finish,
+# so navigation waits for the first day block instead of the load event.
+MOVEMENTS_READY_SELECTOR = DAYS_SELECTOR
+NAVIGATION_TIMEOUT_MS = 30_000
+WEBDRIVER_INIT_SCRIPT = (
+    "Object.defineProperty(navigator, 'webdriver', { get: () => false });"
+)
+
 
 class MercadoPagoClient:
     def __init__(
@@ -10,10 +32,16 @@ class MercadoPagoClient:
         user_data_dir: str = "mp_profile",
         headless: bool = False,
         slow_mo_ms: int | None = None,
+        blocker: ResourceBlocker | None = None,
+        readiness_policy: ReadinessPolicy | None = None,
     ) -> None:
         self._user_data_dir = user_data_dir
         self._headless = headless
         self._slow_mo_ms = slow_mo_ms
+        self._blocker = blocker or ResourceBlocker()
+        self._readiness_policy = readiness_policy or ReadinessPolicy()
+        self.last_readiness: ReadinessResult | None = None
+        self.last_page_stats: PageLoadStats | None = None
         self._playwright = None
         self._context = None
         self._page = None
@@ -27,10 +55,8 @@ class MercadoPagoClient:
             args=["--disable-blink-features=AutomationControlled"],
             ignore_default_args=["--enable-automation"],
         )
-        self._page = self._context.new_page()
-        self._page.add_init_script(
-            "Object.defineProperty(navigator, 'webdriver', { get: () => false });"
-        )
+        self._blocker.install(self._context)
+        self._page = self.open_tab()
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
@@ -45,25 +71,115 @@ class MercadoPagoClient:
             raise RuntimeError("Client not started. Use as a context manager.")
         return self._page
 
-    def goto_home(self) -> None:
-        self.page.goto("https://www.mercadopago.com.br/home")
-        self.page.wait_for_load_state("load")
+    def open_tab(self):
+        if self._context is None:
+            raise RuntimeError("Client not started. Use as a context manager.")
+        page = self._context.new_page()
+        page.add_init_script(WEBDRIVER_INIT_SCRIPT)
+        return page
+
+    @property
+    def readiness_policy(self) -> ReadinessPolicy:
+        return self._readiness_policy
+
+    @property
+    def blocker(self) -> ResourceBlocker:
+        return self._blocker
+
+    def begin_page_stats(self, page: str) -> None:
+        self._blocker.begin(page)
+
+    def end_page_stats(self) -> PageLoadStats | None:
+        # Safe to call twice; only the first call after begin records.
+        stats = self._blocker.end()
+        if stats is not None:
+            self.last_page_stats = stats
+            print(f"[scraper] {stats.summary()}")
+        return stats
 
-    def goto_movements(self, page_number: int | None = None) -> None:
+    def goto_home(self) -> str:
+        # Returns the readiness state /home settled in; pass it to
+        # ensure_logged_in so it does not wait for the markers again.
+        self.begin_page_stats("home")
+        try:
+            self.page.goto(
+                "https://www.mercadopago.com.br/home",
+                wait_until="domcontentloaded",
+                timeout=NAVIGATION_TIMEOUT_MS,
+            )
+            # Any state ensure_logged_in distinguishes means /home settled.
+            return wait_for_state(self.page, self._readiness_policy.marker_timeout_ms)
+        finally:
+            self.end_page_stats()
+
+    @staticmethod
+    def movements_url(page_number: int | None = None) -> str:
         url = "https://www.mercadopago.com.br/banking/balance/movements"
         if page_number:
             url = f"{url}?page={page_number}"
-        self.page.goto(url)
-        self.page.wait_for_load_state("load")
-
-    def ensure_logged_in(self) -> None:
-        if self.page.locator(
-            'text={"message":"local_rate_limited","status":429}'
-        ).count():
-            raise ValueError("Too many requests.")
-        if self.page.locator("text=Iniciar sess\u00e3o").count():
-            raise ValueError("Login required. Run the login flow first.")
-        # if not self.page.locator("text=Sua \u00faltima atividade").count():
-        if not self.page.locator("text=ltimas atividades").count():
-            time.sleep(2000)
-            # raise ValueError("Login state unknown; page may have changed.")
+        return url
+
+    def wait_for_movements(self, page=None) -> None:
+        page = page or self.page
+        # The 429 page never renders the list; stop waiting as soon as it shows.
+        page.locator(MOVEMENTS_READY_SELECTOR).or_(
+            page.locator(RATE_LIMIT_SELECTOR)
+        ).first.wait_for(timeout=NAVIGATION_TIMEOUT_MS)
+        if self.is_rate_limited(page):
+            # Same postponement as a 429 on /home, so the runner retries later
+            # instead of waiting for the next daily slot.
+            raise RateLimitedError(
+                "Too many requests.",
+                retry_after_s=self._readiness_policy.rate_limit_postpone_s,
+            )
+
+    def is_rate_limited(self, page=None) -> bool:
+        page = page or self.page
+        return bool(page.locator(RATE_LIMIT_SELECTOR).count())
+
+    def start_movements(self, page_number: int | None = None, page=None) -> None:
+        # Returns once navigation commits, so several tabs can load at once;
+        # wait_for_movements finishes the page.
+        page = page or self.page
+        page.goto(
+            self.movements_url(page_number),
+            wait_until="commit",
+            timeout=NAVIGATION_TIMEOUT_MS,
+        )
+
+    def is_alive(self) -> bool:
+        if self._page is None or self._page.is_closed():
+            return False
+        try:
+            return bool(self._page.evaluate("() => true"))
+        except Exception:
+            return False
+
+    @staticmethod
+    def browser_memory_mb() -> float:
+        # Resident memory of the Chromium processes (browser, GPU, renderers)
+        # Playwright started under this process. Shared pages count once per
+        # process, so this overstates the total, but it tracks growth.
+        rss = 0
+        for process in psutil.Process().children(recursive=True):
+            with contextlib.suppress(psutil.Error):
+                if "chrom" in process.name().lower():
+                    rss += process.memory_info().rss
+        return rss / (1024 * 1024)
+
+    def save_snapshot(self, path: str | Path, page=None) -> None:
+        page = page or self.page
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(page.content(), encoding="utf-8")
+
+    def ensure_logged_in(self, state: str | None = None) -> ReadinessResult:
+        # Retries 429s with backoff by reloading /home; raises a
+        # ScraperNotReadyError carrying the outcome and time spent otherwise.
+        # state: what goto_home returned, if it was just called.
+        result = wait_until_ready(
+            self.page, self.goto_home, self._readiness_policy, state
+        )
+        self.last_readiness = result
+        print(f"[scraper] readiness: {result.summary()}")
+        return result
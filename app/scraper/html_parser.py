@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from selectolax.lexbor import LexborHTMLParser
+
+from app.domain.models import Transaction
+from app.scraper.parser import (
+    DAY_TITLE_SELECTOR,
+    DAYS_SELECTOR,
+    ROW_AMOUNT_SELECTOR,
+    ROW_PRIMARY_SELECTOR,
+    ROW_SECONDARY_SELECTOR,
+    ROW_SELECTOR,
+    ROW_TIME_SELECTOR,
+    SNAPSHOT_TIME_FORMAT,
+    parse_days_payload,
+)
+from app.storage.db import get_connection
+from app.storage.repo import TransactionRepository
+
+_SNAPSHOT_TIME_RE = re.compile(r"(\d{8}T\d{6}Z)")
+
+
+def _node_text(root, selector: str) -> str | None:
+    node = root.css_first(selector)
+    return node.text(deep=True) if node is not None else None
+
+
+def extract_days_html(html: str) -> list[dict]:
+    tree = LexborHTMLParser(html)
+    days: list[dict] = []
+    for day_node in tree.css(DAYS_SELECTOR):
+        title = _node_text(day_node, DAY_TITLE_SELECTOR)
+        if title is None:
+            raise ValueError("Day header not found; page structure may have changed.")
+        rows: list[dict] = []
+        for row_node in day_node.css(ROW_SELECTOR):
+            row = {
+                "description_primary": _node_text(row_node, ROW_PRIMARY_SELECTOR),
+                "description_secondary": _node_text(row_node, ROW_SECONDARY_SELECTOR) or "",
+                "amount_text": _node_text(row_node, ROW_AMOUNT_SELECTOR),
+                "time_text": _node_text(row_node, ROW_TIME_SELECTOR),
+            }
+            if None in (row["description_primary"], row["amount_text"], row["time_text"]):
+                raise ValueError("Row fields not found; page structure may have changed.")
+            rows.append(row)
+        days.append({"title": title, "rows": rows})
+    return days
+
+
+def parse_transactions_html(
+    html: str, reference: datetime | None = None
+) -> list[Transaction]:
+    return parse_days_payload(extract_days_html(html), reference)
+
+
+def snapshot_reference(path: Path) -> datetime:
+    # Relative headers ("Hoje") resolve against the capture time, in UTC like
+    # the live parser, so re-parsing yields the original mp_ids.
+    match = _SNAPSHOT_TIME_RE.search(path.name)
+    if match:
+        return datetime.strptime(match.group(1), SNAPSHOT_TIME_FORMAT)
+    mtime = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+    return mtime.replace(tzinfo=None)
+
+
+def parse_snapshot_file(
+    path: str | Path, reference: datetime | None = None
+) -> list[Transaction]:
+    path = Path(path)
+    html = path.read_text(encoding="utf-8")
+    return parse_transactions_html(html, reference or snapshot_reference(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-parse saved movements snapshots without a browser."
+    )
+    parser.add_argument("snapshots", nargs="+")
+    parser.add_argument(
+        "--insert", action="store_true", help="store the parsed transactions"
+    )
+    args = parser.parse_args()
+
+    transactions: list[Transaction] = []
+    for snapshot in args.snapshots:
+        parsed = parse_snapshot_file(snapshot)
+        print(f"{snapshot}: {len(parsed)} transactions")
+        transactions.extend(parsed)
+
+    if args.insert:
+        with get_connection() as conn:
+            inserted = TransactionRepository(conn).insert_transactions(transactions)
+        print(f"inserted={inserted}")
+
+
+if __name__ == "__main__":
+    main()
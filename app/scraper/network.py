@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.domain.models import Transaction
+from app.scraper.parser import _build_mp_id
+
+MOVEMENTS_API_MARKER = "/banking/balance/movements"
+CAPTURE_TIMEOUT_MS = 15_000
+
+# The movements XHR is not a documented API, so its shape is pinned here and
+# anything else raises instead of being guessed at:
+#   {"results": [{"date_created": "<ISO 8601 with offset>",
+#                 "amount": <number, unsigned>,
+#                 "direction": "incoming" | "outgoing",
+#                 "title": "<primary text>",
+#                 "subtitle": "<secondary text>" | null}, ...], ...}
+# benchmarks/fixtures/movements_sample.json follows it.
+ITEMS_KEY = "results"
+DATE_KEY = "date_created"
+AMOUNT_KEY = "amount"
+DIRECTION_KEY = "direction"
+PRIMARY_KEY = "title"
+SECONDARY_KEY = "subtitle"
+DIRECTION_SIGNS = {"incoming": 1, "outgoing": -1}
+# The account's wall clock, which the DOM shows regardless of the host's
+# timezone (the Docker image runs in UTC).
+ACCOUNT_TZ = ZoneInfo("America/Sao_Paulo")
+
+
+class UnexpectedPayloadError(ValueError):
+    pass
+
+
+def _field(item: dict, key: str, kind):
+    value = item.get(key)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise UnexpectedPayloadError(
+            f"Movements item field {key!r} is {value!r}; the XHR format may have changed."
+        )
+    return value
+
+
+def _occurred_at(value: str) -> str:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        dt = None
+    if dt is None or dt.tzinfo is None:
+        raise UnexpectedPayloadError(
+            f"Movements date {value!r} has no timezone; the XHR format may have changed."
+        )
+    # Same wall clock the DOM shows, so mp_ids match the DOM parser.
+    return dt.astimezone(ACCOUNT_TZ).strftime("%Y-%m-%d %H:%M")
+
+
+def _item_to_transaction(item: dict) -> Transaction:
+    if not isinstance(item, dict):
+        raise UnexpectedPayloadError("Movements item is not an object.")
+    direction = _field(item, DIRECTION_KEY, str)
+    if direction not in DIRECTION_SIGNS:
+        raise UnexpectedPayloadError(
+            f"Unknown movement direction {direction!r}; the XHR format may have changed."
+        )
+    amount_signed = DIRECTION_SIGNS[direction] * abs(float(_field(item, AMOUNT_KEY, (int, float))))
+    occurred_at = _occurred_at(_field(item, DATE_KEY, str))
+    description_primary = _field(item, PRIMARY_KEY, str).strip()
+    secondary = item.get(SECONDARY_KEY)
+    if secondary is not None and not isinstance(secondary, str):
+        raise UnexpectedPayloadError(
+            f"Movements item field {SECONDARY_KEY!r} is {secondary!r}; "
+            "the XHR format may have changed."
+        )
+    description_secondary = (secondary or "").strip()
+
+    transaction = Transaction.from_scrape(
+        mp_id=_build_mp_id(
+            occurred_at=occurred_at,
+            amount_signed=amount_signed,
+            description_primary=description_primary,
+            description_secondary=description_secondary,
+        ),
+        occurred_at=occurred_at,
+        amount_signed=amount_signed,
+        description_primary=description_primary,
+        description_secondary=description_secondary,
+    )
+    return Transaction(
+        mp_id=transaction.mp_id,
+        occurred_at=transaction.occurred_at,
+        amount=transaction.amount,
+        direction=transaction.direction,
+        description_primary=transaction.description_primary,
+        description_secondary=transaction.description_secondary,
+        description=transaction.description,
+        raw_json=json.dumps(item),
+    )
+
+
+def parse_movements_payload(payload) -> list[Transaction]:
+    items = payload.get(ITEMS_KEY) if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise UnexpectedPayloadError(
+            f"Movements payload has no {ITEMS_KEY!r} list; the XHR format may have changed."
+        )
+    transactions = [_item_to_transaction(item) for item in items]
+    transactions.sort(key=lambda t: t.occurred_at)
+    return transactions
+
+
+def _is_movements_response(response) -> bool:
+    if response.request.resource_type not in {"xhr", "fetch"}:
+        return False
+    if MOVEMENTS_API_MARKER not in response.url:
+        return False
+    return "json" in response.headers.get("content-type", "")
+
+
+class MovementsCapture:
+    # Collects the movements XHR on one tab from start() to finish(), so
+    # several tabs can navigate before any of them is waited on.
+    def __init__(self, page) -> None:
+        self._page = page
+        self._responses = []
+
+    def _on_response(self, response) -> None:
+        # Bodies are read after navigation; blocking calls are not safe here.
+        if _is_movements_response(response):
+            self._responses.append(response)
+
+    def start(self, url: str) -> None:
+        self._page.on("response", self._on_response)
+        try:
+            self._page.goto(url, wait_until="commit")
+        except Exception:
+            self._page.remove_listener("response", self._on_response)
+            raise
+
+    def finish(self, timeout_ms: int = CAPTURE_TIMEOUT_MS) -> list[Transaction]:
+        try:
+            # Responses that arrived while other tabs were waited on are
+            # already collected.
+            if not self._responses:
+                self._page.wait_for_event(
+                    "response", predicate=_is_movements_response, timeout=timeout_ms
+                )
+        finally:
+            self._page.remove_listener("response", self._on_response)
+
+        transactions: dict[str, Transaction] = {}
+        for response in self._responses:
+            for transaction in parse_movements_payload(response.json()):
+                transactions[transaction.mp_id] = transaction
+        return sorted(transactions.values(), key=lambda t: t.occurred_at)
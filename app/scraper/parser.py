@@ -3,10 +3,10 @@ from __future__ import annotations
 import json
 import re
 import hashlib
-
-import dateparser
+from datetime import datetime
 
 from app.domain.models import Transaction
+from app.processing.date_utils import resolve_relative_date
 
 BRL_PATTERN = re.compile(
     r"""
@@ -23,6 +23,10 @@ BRL_PATTERN = re.compile(
 )
 
 
+class NoTransactionsError(ValueError):
+    pass
+
+
 def convert_brl_format(text: str) -> float:
     m = BRL_PATTERN.match(text)
     if not m:
@@ -38,15 +42,8 @@ def convert_brl_format(text: str) -> float:
     return sign * float(f"{integer_part}.{cents_part}")
 
 
-def convert_relative_date(date_text: str) -> str:
-    dt = dateparser.parse(
-        date_text,
-        languages=["pt"],
-        settings={"TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": False},
-    )
-    if dt is None:
-        raise ValueError("Date parsing failed.")
-    return dt.strftime("%Y-%m-%d")
+def convert_relative_date(date_text: str, reference: datetime | None = None) -> str:
+    return resolve_relative_date(date_text, reference)
 
 
 def _normalize_time(time_text: str) -> str:
@@ -78,44 +75,117 @@ def _build_mp_id(
     return f"{occurred_at}:{digest}"
 
 
-def parse_transactions_page(page) -> list[Transaction]:
-
-    days_el = page.locator(".binnacle-list .binnacle-rows-wrapper")
-    if days_el.count() == 0:
-        raise ValueError("No transactions found; page structure may have changed.")
-
-    transactions: list[Transaction] = []
-
+DAYS_SELECTOR = ".binnacle-list .binnacle-rows-wrapper"
+DAY_TITLE_SELECTOR = ".binnacle-rows-wrapper__header .binnacle-rows-wrapper__title"
+ROW_SELECTOR = ".binnacle-row"
+ROW_PRIMARY_SELECTOR = (
+    ".andes-list__item-first-column .andes-list__item-primary .binnacle-row__title"
+)
+ROW_SECONDARY_SELECTOR = ".andes-list__item-first-column .andes-list__item-secondary"
+ROW_AMOUNT_SELECTOR = ".andes-list__item-second-column .andes-money-amount"
+ROW_TIME_SELECTOR = ".andes-list__item-second-column .binnacle-row__time"
+
+SNAPSHOT_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+# Collects every day header and row in a single browser round trip. Missing
+# mandatory fields come back as null so the caller can fall back to locators.
+_EXTRACT_DAYS_JS = """
+(sel) => Array.from(document.querySelectorAll(sel.days)).map((day) => {
+    const text = (root, s) => {
+        const el = root.querySelector(s);
+        return el ? el.textContent : null;
+    };
+    return {
+        title: text(day, sel.title),
+        rows: Array.from(day.querySelectorAll(sel.row)).map((row) => ({
+            description_primary: text(row, sel.primary),
+            description_secondary: text(row, sel.secondary) ?? "",
+            amount_text: text(row, sel.amount),
+            time_text: text(row, sel.time),
+        })),
+    };
+})
+"""
+
+
+def snapshot_filename(captured_at: datetime, page_number: int) -> str:
+    return f"movements-{captured_at.strftime(SNAPSHOT_TIME_FORMAT)}-p{page_number}.html"
+
+
+def extract_days_evaluate(page) -> list[dict]:
+    days = page.evaluate(
+        _EXTRACT_DAYS_JS,
+        {
+            "days": DAYS_SELECTOR,
+            "title": DAY_TITLE_SELECTOR,
+            "row": ROW_SELECTOR,
+            "primary": ROW_PRIMARY_SELECTOR,
+            "secondary": ROW_SECONDARY_SELECTOR,
+            "amount": ROW_AMOUNT_SELECTOR,
+            "time": ROW_TIME_SELECTOR,
+        },
+    )
+    for day in days:
+        if day["title"] is None:
+            raise ValueError("Day header not found; page structure may have changed.")
+        for row in day["rows"]:
+            if None in (row["description_primary"], row["amount_text"], row["time_text"]):
+                raise ValueError("Row fields not found; page structure may have changed.")
+    return days
+
+
+def extract_days_locators(page) -> list[dict]:
+    days_el = page.locator(DAYS_SELECTOR)
+    days: list[dict] = []
     for i in range(days_el.count()):
         day_el = days_el.nth(i)
-        day_text = day_el.locator(
-            ".binnacle-rows-wrapper__header .binnacle-rows-wrapper__title"
-        ).text_content()
-
-        day_date = convert_relative_date(day_text)
-
-        rows_el = day_el.locator(".binnacle-row")
-        day_rows: list[dict[str, str]] = []
+        rows_el = day_el.locator(ROW_SELECTOR)
+        rows: list[dict] = []
         for j in range(rows_el.count()):
             row_el = rows_el.nth(j)
-            description_primary = row_el.locator(
-                ".andes-list__item-first-column .andes-list__item-primary .binnacle-row__title"
-            ).text_content()
-
-            sec_locator = row_el.locator(
-                ".andes-list__item-first-column .andes-list__item-secondary"
+            sec_locator = row_el.locator(ROW_SECONDARY_SELECTOR)
+            rows.append(
+                {
+                    "description_primary": row_el.locator(
+                        ROW_PRIMARY_SELECTOR
+                    ).text_content(),
+                    "description_secondary": (
+                        sec_locator.text_content() if sec_locator.count() else ""
+                    ),
+                    "amount_text": row_el.locator(ROW_AMOUNT_SELECTOR).text_content(),
+                    "time_text": row_el.locator(ROW_TIME_SELECTOR).text_content(),
+                }
             )
-            description_secondary = sec_locator.text_content() if sec_locator.count() else ""
+        days.append(
+            {
+                "title": day_el.locator(DAY_TITLE_SELECTOR).text_content(),
+                "rows": rows,
+            }
+        )
+    return days
+
+
+def parse_days_payload(
+    days: list[dict], reference: datetime | None = None
+) -> list[Transaction]:
+    if not days:
+        raise NoTransactionsError(
+            "No transactions found; page structure may have changed."
+        )
+
+    transactions: list[Transaction] = []
 
-            amount_text = row_el.locator(
-                ".andes-list__item-second-column .andes-money-amount"
-            ).text_content()
-            time_text = row_el.locator(
-                ".andes-list__item-second-column .binnacle-row__time"
-            ).text_content()
+    for day in days:
+        day_date = convert_relative_date(day["title"], reference)
+
+        day_rows: list[dict[str, str]] = []
+        for row in day["rows"]:
+            description_primary = row["description_primary"]
+            description_secondary = row["description_secondary"]
+            amount_text = row["amount_text"]
 
             amount_signed = convert_brl_format(amount_text)
-            time_value = _normalize_time(time_text)
+            time_value = _normalize_time(row["time_text"])
             occurred_at = f"{day_date} {time_value}"
 
             raw_payload = {
@@ -164,3 +234,19 @@ def parse_transactions_page(page) -> list[Transaction]:
 
     transactions.sort(key=lambda t: t.occurred_at)
     return transactions
+
+
+def parse_transactions_page(page, mode: str = "evaluate") -> list[Transaction]:
+    if mode not in {"evaluate", "locators"}:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+
+    if mode == "evaluate":
+        try:
+            days = extract_days_evaluate(page)
+        except ValueError:
+            # Incomplete rows; the locator path waits on each element instead.
+            days = extract_days_locators(page)
+    else:
+        days = extract_days_locators(page)
+
+    return parse_days_payload(days)
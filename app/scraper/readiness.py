@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+READY = "ready"
+LOGGED_OUT = "logged_out"
+RATE_LIMITED = "rate_limited"
+RENDERING = "rendering"
+
+READY_SELECTOR = "text=ltimas atividades"
+LOGGED_OUT_SELECTOR = "text=Iniciar sessão"
+RATE_LIMIT_SELECTOR = 'text={"message":"local_rate_limited","status":429}'
+
+
+@dataclass(frozen=True)
+class ReadinessPolicy:
+    marker_timeout_ms: int = 20_000
+    rate_limit_retries: int = 3
+    rate_limit_base_delay_s: float = 10.0
+    rate_limit_max_delay_s: float = 120.0
+    rendering_retries: int = 1
+    # How long the scheduler should wait before trying again after giving up.
+    rate_limit_postpone_s: float = 15 * 60
+    rendering_postpone_s: float = 5 * 60
+
+
+@dataclass(frozen=True)
+class ReadinessResult:
+    state: str
+    attempts: int
+    waited_s: float
+
+    def summary(self) -> str:
+        return f"{self.state} after {self.attempts} attempt(s), waited {self.waited_s:.1f}s"
+
+
+class ScraperNotReadyError(ValueError):
+    def __init__(
+        self,
+        message: str,
+        result: ReadinessResult | None = None,
+        retry_after_s: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.result = result
+        self.retry_after_s = retry_after_s
+
+
+class RateLimitedError(ScraperNotReadyError):
+    pass
+
+
+class LoginRequiredError(ScraperNotReadyError):
+    pass
+
+
+def detect_state(page) -> str:
+    if page.locator(RATE_LIMIT_SELECTOR).count():
+        return RATE_LIMITED
+    if page.locator(LOGGED_OUT_SELECTOR).count():
+        return LOGGED_OUT
+    if page.locator(READY_SELECTOR).count():
+        return READY
+    return RENDERING
+
+
+def wait_for_state(page, timeout_ms: int) -> str:
+    markers = (
+        page.locator(READY_SELECTOR)
+        .or_(page.locator(LOGGED_OUT_SELECTOR))
+        .or_(page.locator(RATE_LIMIT_SELECTOR))
+    )
+    try:
+        markers.first.wait_for(timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        return RENDERING
+    return detect_state(page)
+
+
+def _backoff_delay(policy: ReadinessPolicy, retry: int) -> float:
+    delay = min(
+        policy.rate_limit_base_delay_s * (2 ** (retry - 1)),
+        policy.rate_limit_max_delay_s,
+    )
+    # Full jitter keeps repeated runs from hitting the limiter in lockstep.
+    return random.uniform(delay / 2, delay)
+
+
+# reload navigates again and returns the state it waited for; state is the
+# one the caller's own navigation already waited for. Either way each load
+# is waited on once, so a slow page costs one marker_timeout per attempt.
+def wait_until_ready(
+    page,
+    reload: Callable[[], str],
+    policy: ReadinessPolicy | None = None,
+    state: str | None = None,
+) -> ReadinessResult:
+    policy = policy or ReadinessPolicy()
+    started = time.perf_counter()
+    attempts = 0
+    rate_limited = 0
+    rendering = 0
+
+    while True:
+        attempts += 1
+        if state is None:
+            state = wait_for_state(page, policy.marker_timeout_ms)
+        result = ReadinessResult(state, attempts, time.perf_counter() - started)
+
+        if state == READY:
+            return result
+        if state == LOGGED_OUT:
+            raise LoginRequiredError(
+                "Login required. Run the login flow first.", result
+            )
+        if state == RATE_LIMITED:
+            rate_limited += 1
+            if rate_limited > policy.rate_limit_retries:
+                raise RateLimitedError(
+                    "Too many requests.", result, policy.rate_limit_postpone_s
+                )
+            time.sleep(_backoff_delay(policy, rate_limited))
+        else:
+            rendering += 1
+            if rendering > policy.rendering_retries:
+                raise ScraperNotReadyError(
+                    "Home page did not finish rendering.",
+                    result,
+                    policy.rendering_postpone_s,
+                )
+        state = reload()
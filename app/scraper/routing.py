@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+DEFAULT_BLOCKED_DOMAINS = frozenset(
+    {
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "facebook.net",
+        "facebook.com",
+        "hotjar.com",
+        "clarity.ms",
+        "newrelic.com",
+        "nr-data.net",
+    }
+)
+
+
+def _env_set(name: str, default: frozenset[str]) -> frozenset[str]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return frozenset(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+def _matches_domain(host: str, domains: frozenset[str]) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+@dataclass(frozen=True)
+class BlockingConfig:
+    enabled: bool = True
+    blocked_resource_types: frozenset[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    blocked_domains: frozenset[str] = DEFAULT_BLOCKED_DOMAINS
+    # Allowed domains win over both deny lists.
+    allowed_domains: frozenset[str] = frozenset()
+    # Let the first load of each page through to measure what blocking saves.
+    calibrate: bool = False
+
+    @classmethod
+    def from_env(cls) -> "BlockingConfig":
+        return cls(
+            enabled=os.getenv("SCRAPE_BLOCK_RESOURCES", "1") == "1",
+            blocked_resource_types=_env_set(
+                "SCRAPE_BLOCK_TYPES", DEFAULT_BLOCKED_RESOURCE_TYPES
+            ),
+            blocked_domains=_env_set("SCRAPE_BLOCK_DOMAINS", DEFAULT_BLOCKED_DOMAINS),
+            allowed_domains=_env_set("SCRAPE_ALLOW_DOMAINS", frozenset()),
+            calibrate=os.getenv("SCRAPE_BLOCK_CALIBRATE") == "1",
+        )
+
+
+@dataclass
+class PageLoadStats:
+    page: str
+    elapsed_ms: float = 0.0
+    requests: int = 0
+    blocked: int = 0
+    bytes_loaded: int = 0
+    baseline: "PageLoadStats | None" = field(default=None, repr=False)
+
+    @property
+    def bytes_saved(self) -> int | None:
+        if self.baseline is None:
+            return None
+        return self.baseline.bytes_loaded - self.bytes_loaded
+
+    @property
+    def ms_saved(self) -> float | None:
+        if self.baseline is None:
+            return None
+        return self.baseline.elapsed_ms - self.elapsed_ms
+
+    def summary(self) -> str:
+        text = (
+            f"{self.page}: {self.elapsed_ms:.0f} ms, {self.requests} requests, "
+            f"{self.bytes_loaded / 1024:.0f} KB loaded, {self.blocked} blocked"
+        )
+        if self.baseline is not None:
+            text += (
+                f", saved {self.bytes_saved / 1024:.0f} KB / {self.ms_saved:.0f} ms"
+            )
+        return text
+
+
+class ResourceBlocker:
+    def __init__(self, config: BlockingConfig | None = None) -> None:
+        self._config = config or BlockingConfig.from_env()
+        self._current: PageLoadStats | None = None
+        self._started_at = 0.0
+        self._passthrough = False
+        self._baselines: dict[str, PageLoadStats] = {}
+
+    def install(self, context) -> None:
+        # Playwright disables the HTTP cache for routed contexts, so only
+        # route at all when blocking is enabled.
+        if self._config.enabled:
+            context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        if _matches_domain(host, self._config.allowed_domains):
+            return False
+        if resource_type in self._config.blocked_resource_types:
+            return True
+        return _matches_domain(host, self._config.blocked_domains)
+
+    def _handle_route(self, route) -> None:
+        request = route.request
+        stats = self._current
+        if not self._passthrough and self.should_block(request.resource_type, request.url):
+            if stats is not None:
+                stats.blocked += 1
+            route.abort()
+            return
+        route.continue_()
+
+    def _on_response(self, response) -> None:
+        stats = self._current
+        if stats is None:
+            return
+        stats.requests += 1
+        # Content-Length is free to read; chunked responses count as zero.
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            stats.bytes_loaded += int(length)
+
+    def begin(self, page: str) -> None:
+        self._current = PageLoadStats(page=page)
+        self._passthrough = (
+            self._config.enabled
+            and self._config.calibrate
+            and page not in self._baselines
+        )
+        self._started_at = time.perf_counter()
+
+    def end(self) -> PageLoadStats | None:
+        stats = self._current
+        if stats is None:
+            return None
+        stats.elapsed_ms = (time.perf_counter() - self._started_at) * 1000
+        self._current = None
+        if self._passthrough:
+            self._baselines[stats.page] = stats
+            self._passthrough = False
+        else:
+            stats.baseline = self._baselines.get(stats.page)
+        return stats
@@ -1,51 +1,313 @@
 from __future__ import annotations
 
-from datetime import datetime
+import random
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from app.domain.models import Transaction
+from app.metrics.timing import SpanRecorder
 from app.scraper.client import MercadoPagoClient
-from app.scraper.parser import parse_transactions_page
+from app.scraper.network import MovementsCapture
+from app.scraper.parser import (
+    NoTransactionsError,
+    parse_transactions_page,
+    snapshot_filename,
+)
+from app.scraper.readiness import RateLimitedError
+
+STRATEGIES = {"dom", "network"}
+
+# Concurrent pagination backs off on 429: the tab window halves and the
+# rate-limited pages are retried after a jittered, doubling pause.
+RATE_LIMIT_BASE_DELAY_S = 2.0
+RATE_LIMIT_MAX_DELAY_S = 60.0
+RATE_LIMIT_MAX_RETRIES = 4
 
 
 class ScraperService:
-    def __init__(self, client: MercadoPagoClient) -> None:
+    def __init__(
+        self,
+        client: MercadoPagoClient,
+        snapshot_dir: str | None = None,
+        recorder: SpanRecorder | None = None,
+    ) -> None:
         self._client = client
+        self._recorder = recorder or SpanRecorder()
+        self._snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+
+    def _save_snapshot(self, page_number: int, tab=None) -> None:
+        if self._snapshot_dir is None:
+            return
+        captured_at = datetime.now(timezone.utc)
+        self._client.save_snapshot(
+            self._snapshot_dir / snapshot_filename(captured_at, page_number), tab
+        )
+
+    def _page_stats_detail(self, label: str) -> str:
+        stats = self._client.end_page_stats()
+        if stats is None:
+            return label
+        return f"{label}; {stats.summary()}"
+
+    # Loading a page is split in two so the concurrent path can start every
+    # tab's navigation before waiting on any of them; the sequential path
+    # runs both halves back to back.
+    def _start_page(self, tab, page_number: int, strategy: str) -> MovementsCapture | None:
+        page_arg = page_number if page_number > 1 else None
+        if strategy == "network":
+            capture = MovementsCapture(tab)
+            capture.start(self._client.movements_url(page_arg))
+            return capture
+        self._client.start_movements(page_arg, tab)
+        return None
+
+    def _finish_page(
+        self,
+        tab,
+        page_number: int,
+        capture: MovementsCapture | None,
+        own_stats: bool = False,
+    ) -> list[Transaction]:
+        # own_stats: this page alone is being measured, so its load stats
+        # end here; the concurrent path measures whole tab windows instead.
+        if capture is not None:
+            with self._recorder.span("capture_movements", f"page {page_number}") as span:
+                try:
+                    transactions = capture.finish()
+                except PlaywrightTimeoutError:
+                    transactions = []
+                span.rows = len(transactions)
+                if transactions and own_stats:
+                    span.detail = self._page_stats_detail(span.detail)
+            if transactions:
+                return transactions
+        # DOM strategy, or no usable XHR payload: wait for the list and read it.
+        # A page with no list (past the last page, or an empty account) reads
+        # as no rows, which callers take as the end of history.
+        with self._recorder.span("wait_for_movements", f"page {page_number}") as span:
+            try:
+                self._client.wait_for_movements(tab)
+            except PlaywrightTimeoutError:
+                span.detail = f"{span.detail}, no movements list"
+                return []
+            finally:
+                if own_stats:
+                    span.detail = self._page_stats_detail(span.detail)
+        self._save_snapshot(page_number, tab)
+        with self._recorder.span("parse_transactions_page", f"page {page_number}") as span:
+            try:
+                transactions = parse_transactions_page(tab)
+            except NoTransactionsError:
+                transactions = []
+            span.rows = len(transactions)
+        return transactions
+
+    def _scrape_page(self, page_number: int, strategy: str) -> list[Transaction]:
+        tab = self._client.page
+        self._client.begin_page_stats("movements")
+        try:
+            capture = self._start_page(tab, page_number, strategy)
+            return self._finish_page(tab, page_number, capture, own_stats=True)
+        finally:
+            self._client.end_page_stats()
+
+    def _scrape_pages_concurrently(
+        self, page_numbers: list[int], max_tabs: int, strategy: str
+    ) -> list[Transaction]:
+        pending = deque(page_numbers)
+        retries: dict[int, int] = {}
+        results: list[Transaction] = []
+        tabs_allowed = max_tabs
+        delay = RATE_LIMIT_BASE_DELAY_S
+        # Highest page that showed rows, across windows.
+        last_loaded = 0
+        tabs = []
+        try:
+            while pending:
+                window = [pending.popleft() for _ in range(min(tabs_allowed, len(pending)))]
+                while len(tabs) < len(window):
+                    tabs.append(self._client.open_tab())
+
+                limited: list[int] = []
+                empty: list[int] = []
+                loaded: list[int] = []
+                self._client.begin_page_stats("movements")
+                with self._recorder.span("tab_window") as span:
+                    span.rows = 0
+                    try:
+                        # Start every navigation first so the browser loads
+                        # them in parallel.
+                        captures = {}
+                        for tab, page_number in zip(tabs, window):
+                            try:
+                                captures[page_number] = self._start_page(
+                                    tab, page_number, strategy
+                                )
+                            except PlaywrightTimeoutError:
+                                empty.append(page_number)
+                        for tab, page_number in zip(tabs, window):
+                            if page_number in empty:
+                                continue
+                            try:
+                                page_transactions = self._finish_page(
+                                    tab, page_number, captures[page_number]
+                                )
+                            except RateLimitedError:
+                                limited.append(page_number)
+                                continue
+                            if not page_transactions:
+                                empty.append(page_number)
+                                continue
+                            loaded.append(page_number)
+                            span.rows += len(page_transactions)
+                            results.extend(page_transactions)
+                    finally:
+                        span.detail = self._page_stats_detail(
+                            f"pages {window[0]}-{window[-1]}, {len(window)} tabs"
+                        )
+
+                # An empty or timed-out page past the last loaded one is the
+                # end of history: keep what was collected and stop there.
+                # One followed by loaded pages was a hiccup; retry it.
+                last_loaded = max([last_loaded, *loaded])
+                end_of_history = [n for n in empty if n > last_loaded]
+                if end_of_history:
+                    end = min(end_of_history)
+                    pending = deque(n for n in pending if n < end)
+                    limited = [n for n in limited if n < end]
+                for page_number in (n for n in empty if n < last_loaded):
+                    retries[page_number] = retries.get(page_number, 0) + 1
+                    if retries[page_number] > RATE_LIMIT_MAX_RETRIES:
+                        print(f"[scraper] page {page_number} never loaded; skipping it")
+                    else:
+                        pending.append(page_number)
+
+                if not limited:
+                    tabs_allowed = min(max_tabs, tabs_allowed + 1)
+                    delay = RATE_LIMIT_BASE_DELAY_S
+                    continue
+
+                for page_number in limited:
+                    retries[page_number] = retries.get(page_number, 0) + 1
+                    if retries[page_number] > RATE_LIMIT_MAX_RETRIES:
+                        raise RateLimitedError(
+                            "Too many requests.",
+                            retry_after_s=self._client.readiness_policy.rate_limit_postpone_s,
+                        )
+                pending.extendleft(reversed(limited))
+                tabs_allowed = max(1, tabs_allowed // 2)
+                while len(tabs) > tabs_allowed:
+                    tabs.pop().close()
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, RATE_LIMIT_MAX_DELAY_S)
+        finally:
+            for tab in tabs:
+                tab.close()
+        return results
+
+    @staticmethod
+    def _reached_known(
+        page_transactions: list[Transaction],
+        known_mp_id: str | None,
+        known_occurred_at: str | None,
+        seen_mp_ids: set[str],
+    ) -> bool:
+        # Pages run newest to oldest. Stop at the end of history (an empty
+        # page, or one that only repeats rows already seen, which is what
+        # paging past the last page returns) or at the first row that is
+        # the stored mark or older than it.
+        if not page_transactions:
+            return True
+        if all(transaction.mp_id in seen_mp_ids for transaction in page_transactions):
+            return True
+        for transaction in page_transactions:
+            if known_mp_id and transaction.mp_id == known_mp_id:
+                return True
+            if known_occurred_at and transaction.occurred_at <= known_occurred_at:
+                return True
+        return False
+
+    @staticmethod
+    def _filter_cutoff(
+        page_transactions: list[Transaction], cutoff: date
+    ) -> list[Transaction]:
+        filtered = []
+        for transaction in page_transactions:
+            date_part = transaction.occurred_at.split(" ")[0]
+            if datetime.strptime(date_part, "%Y-%m-%d").date() < cutoff:
+                continue
+            filtered.append(transaction)
+        return filtered
 
     def scrape_transactions(
         self,
         max_pages: int = 1,
         min_date: str | None = None,
-    ) -> list[Transaction]:
-        self._client.goto_home()
-        self._client.ensure_logged_in()
+        strategy: str = "dom",
+        known_mp_id: str | None = None,
+        known_occurred_at: str | None = None,
+        max_tabs: int = 1,
+    ) -> tuple[list[Transaction], bool]:
+        # Also returns whether paging stopped at the stored mark or the end
+        # of history. False means max_pages ran out first, so rows between
+        # the stored mark and the last page fetched are still missing.
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown scrape strategy: {strategy}")
+
+        with self._recorder.span("goto_home") as span:
+            try:
+                home_state = self._client.goto_home()
+            finally:
+                stats = self._client.last_page_stats
+                span.detail = stats.summary() if stats else None
+        with self._recorder.span("ensure_logged_in") as span:
+            readiness = self._client.ensure_logged_in(home_state)
+            span.detail = readiness.summary()
 
         cutoff = None
         if min_date:
             cutoff = datetime.strptime(min_date, "%Y-%m-%d").date()
 
+        # Early stops need page N before deciding on N+1, so only plain
+        # backfills fan out to parallel tabs.
+        concurrent = max_tabs > 1 and not (cutoff or known_mp_id or known_occurred_at)
+
         transactions: list[Transaction] = []
+        seen_mp_ids: set[str] = set()
+        reached_known = False
         for page_number in range(1, max_pages + 1):
-            self._client.goto_movements(page_number if page_number > 1 else None)
-            page_transactions = parse_transactions_page(self._client.page)
-            if not page_transactions:
+            if concurrent and page_number > 1:
+                transactions.extend(
+                    self._scrape_pages_concurrently(
+                        list(range(page_number, max_pages + 1)), max_tabs, strategy
+                    )
+                )
                 break
 
+            page_transactions = self._scrape_page(page_number, strategy)
+            reached_known = self._reached_known(
+                page_transactions, known_mp_id, known_occurred_at, seen_mp_ids
+            )
+            seen_mp_ids.update(transaction.mp_id for transaction in page_transactions)
+
             if cutoff:
-                filtered = []
-                for transaction in page_transactions:
-                    date_part = transaction.occurred_at.split(" ")[0]
-                    if datetime.strptime(date_part, "%Y-%m-%d").date() < cutoff:
-                        continue
-                    filtered.append(transaction)
-                page_transactions = filtered
+                page_transactions = self._filter_cutoff(page_transactions, cutoff)
 
             transactions.extend(page_transactions)
             if cutoff and len(page_transactions) == 0:
                 break
+            if reached_known:
+                break
 
         # import time
         # print("Scraping finished, sleeping to allow graceful browser close...")
         # time.sleep(10000)
 
-        transactions.sort(key=lambda t: t.occurred_at)
-        return transactions
+        # Rows can shift between pages while tabs load, so the same movement
+        # may be parsed twice.
+        unique = {t.mp_id: t for t in transactions}
+        return sorted(unique.values(), key=lambda t: t.occurred_at), reached_known
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import contextlib
+from typing import Iterator
+
+from app.scraper.client import MercadoPagoClient
+from app.scraper.readiness import READY
+
+
+# Keeps one MercadoPagoClient warm across scrape runs. Playwright's sync API
+# is bound to the thread that started it, so use a session from one thread only.
+class BrowserSession:
+    def __init__(
+        self,
+        user_data_dir: str = "data/browser_profile",
+        max_runs: int = 20,
+        max_memory_growth_mb: float = 512.0,
+    ) -> None:
+        self._user_data_dir = user_data_dir
+        self._max_runs = max_runs
+        self._max_memory_growth_mb = max_memory_growth_mb
+        self._client: MercadoPagoClient | None = None
+        self._runs = 0
+        self._baseline_memory_mb: float | None = None
+
+    def _start(self) -> MercadoPagoClient:
+        client = MercadoPagoClient(user_data_dir=self._user_data_dir)
+        client.__enter__()
+        self._client = client
+        self._runs = 0
+        self._baseline_memory_mb = None
+        return client
+
+    def close(self) -> None:
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        with contextlib.suppress(Exception):
+            client.__exit__(None, None, None)
+
+    def _should_recycle(self, client: MercadoPagoClient) -> str | None:
+        if self._runs >= self._max_runs:
+            return f"{self._runs} runs"
+        # Judged on what the scrape left behind, without another page load:
+        # its readiness check on /home must have found the logged-in marker,
+        # or the session expired or the SPA got stuck.
+        readiness = client.last_readiness
+        if readiness is None or readiness.state != READY:
+            return "logged-in marker missing"
+        memory_mb = client.browser_memory_mb()
+        if self._baseline_memory_mb is None:
+            self._baseline_memory_mb = memory_mb
+        elif memory_mb - self._baseline_memory_mb > self._max_memory_growth_mb:
+            return f"browser memory grew to {memory_mb:.0f} MB"
+        return None
+
+    @contextlib.contextmanager
+    def acquire(self) -> Iterator[MercadoPagoClient]:
+        client = self._client
+        if client is None or not client.is_alive():
+            self.close()
+            client = self._start()
+
+        # Cleared so the health check below only trusts this run's result.
+        client.last_readiness = None
+        try:
+            yield client
+        except Exception:
+            self.close()
+            raise
+
+        self._runs += 1
+        try:
+            reason = self._should_recycle(client)
+        except Exception as exc:
+            reason = f"health check failed: {exc}"
+        if reason:
+            print(f"[browser] recycling session: {reason}")
+            self.close()
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from datetime import datetime
 
+import gspread
+
 from app.processing.name_utils import encode_name
 from app.sheets.client import SheetsClient
 
 
+RULES_WORKSHEET = "Regras"
+
+
 class SheetsService:
     def __init__(self, client: SheetsClient):
         self._client = client
@@ -92,6 +97,42 @@ class SheetsService:
                 names_to_nicknames[encode_name(name)] = nicknames[i]
         return names_to_nicknames
 
+    def get_rules(self) -> list[dict]:
+        # Optional tab of exact classifier rules, one per row, that extends
+        # and overrides app/processing/rules.json without a redeploy.
+        try:
+            values = self._client.worksheet(RULES_WORKSHEET).get_all_values()
+        except gspread.exceptions.WorksheetNotFound:
+            return []
+        if not values:
+            return []
+        header = values[0]
+        try:
+            idx_primary = header.index("Descrição MP")
+            idx_counterparty = header.index("Contraparte")
+            idx_description = header.index("Descrição")
+            idx_category = header.index("Categoria")
+        except ValueError:
+            return []
+
+        rules: list[dict] = []
+        for row in values[1:]:
+            if len(row) <= max(idx_primary, idx_counterparty, idx_description, idx_category):
+                continue
+            primary = row[idx_primary].strip()
+            description = row[idx_description].strip()
+            if not primary or not description:
+                continue
+            rules.append(
+                {
+                    "primary": primary,
+                    "counterparty": row[idx_counterparty],
+                    "description": description,
+                    "category": row[idx_category].strip() or None,
+                }
+            )
+        return rules
+
     def get_categories(self) -> list[str]:
         column_names = self._ws_config.row_values(1)
         if "Categorias" not in column_names:
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.storage.db import get_connection, unit_of_work
+from app.storage.repo import ReviewRepository, TransactionRepository
+
+T = TypeVar("T")
+
+DB_EXECUTOR_WORKERS = 4
+
+
+class AsyncDatabase:
+    # sqlite3 blocks, so database work from the bot's event loop runs on a
+    # small dedicated pool. Each worker thread reuses its own connection from
+    # the connection manager; WAL lets reads proceed while another thread writes.
+    def __init__(self, db_path: str | None = None, max_workers: int = DB_EXECUTOR_WORKERS):
+        self._db_path = db_path
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db"
+        )
+
+    def _call(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = get_connection(self._db_path)
+        with unit_of_work(conn):
+            return fn(conn)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        # Runs fn(conn) in one unit of work, for multi-step operations that
+        # must commit together.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn)
+
+    def reviews(self) -> "AsyncReviewRepository":
+        return AsyncReviewRepository(self)
+
+    def transactions(self) -> "AsyncTransactionRepository":
+        return AsyncTransactionRepository(self)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class _AsyncRepository:
+    # Exposes every public method of the wrapped repository as a coroutine
+    # with the same name and arguments.
+    repository_cls: type
+
+    def __init__(self, db: AsyncDatabase):
+        self._db = db
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self.repository_cls, name, None)
+        # Scopes and lazy iterators would run on the caller's thread.
+        if (
+            name.startswith(("_", "iter_"))
+            or name == "transaction"
+            or not callable(method)
+        ):
+            raise AttributeError(name)
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await self._db.run(
+                lambda conn: method(self.repository_cls(conn), *args, **kwargs)
+            )
+
+        return call
+
+
+class AsyncReviewRepository(_AsyncRepository):
+    repository_cls = ReviewRepository
+
+
+class AsyncTransactionRepository(_AsyncRepository):
+    repository_cls = TransactionRepository
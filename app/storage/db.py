@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import contextlib
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Callable, Iterator
 import os
 
+from app.processing.name_utils import encode_name
+
+BUSY_TIMEOUT_MS = 5_000
+CACHE_SIZE_KIB = 16_384
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
 
 def resolve_db_path(db_path: str | None = None) -> str:
     if db_path:
@@ -20,8 +29,8 @@ def resolve_db_path(db_path: str | None = None) -> str:
     return str(base_dir / "transactions.db")
 
 
-def get_connection(db_path: str | None = None) -> sqlite3.Connection:
-    conn = sqlite3.connect(resolve_db_path(db_path))
+def open_connection(db_path: str | None = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(resolve_db_path(db_path), timeout=BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
     _apply_pragmas(conn)
     return conn
@@ -30,9 +39,127 @@ def get_connection(db_path: str | None = None) -> sqlite3.Connection:
 def _apply_pragmas(conn: sqlite3.Connection) -> None:
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA synchronous=NORMAL;")
+    # The runner thread and the bot thread write to the same file; wait for
+    # the other writer instead of failing with "database is locked".
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS};")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB};")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES};")
+    conn.execute("PRAGMA temp_store=MEMORY;")
 
 
-def init_db(conn: sqlite3.Connection) -> None:
+class ConnectionManager:
+    # sqlite3 connections must stay on the thread that opened them, so each
+    # thread gets its own long-lived connection per database file. The schema
+    # is migrated once per file per process.
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._initialized: set[str] = set()
+
+    def connection(self, db_path: str | None = None) -> sqlite3.Connection:
+        path = resolve_db_path(db_path)
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(path)
+        if conn is None:
+            conn = connections[path] = open_connection(path)
+        if path not in self._initialized:
+            with self._schema_lock:
+                if path not in self._initialized:
+                    migrate(conn)
+                    self._initialized.add(path)
+        return conn
+
+    def close_thread_connections(self) -> None:
+        connections = getattr(self._local, "connections", None) or {}
+        for conn in connections.values():
+            conn.close()
+        connections.clear()
+
+
+_manager = ConnectionManager()
+
+
+# Returns this thread's shared connection. "with get_connection() as conn"
+# commits or rolls back on exit but leaves the connection open for reuse.
+def get_connection(db_path: str | None = None) -> sqlite3.Connection:
+    return _manager.connection(db_path)
+
+
+def close_thread_connections() -> None:
+    _manager.close_thread_connections()
+
+
+# Open unit-of-work scopes per connection (keyed by id; sqlite3 connections
+# cannot be weakly referenced). Connections are per thread, so no lock.
+_uow_depth: dict[int, int] = {}
+_after_commit: dict[int, list[Callable[[], None]]] = {}
+
+
+# Nested scopes run in a SAVEPOINT: an exception leaving an inner scope
+# undoes only that scope's writes (and its after_commit callbacks), even when
+# the caller catches it and the outer scope goes on to commit.
+@contextlib.contextmanager
+def unit_of_work(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    key = id(conn)
+    depth = _uow_depth.get(key, 0)
+    savepoint = f"uow_{depth}"
+    if depth > 0:
+        # A SAVEPOINT outside a transaction would open (and its RELEASE
+        # commit) one of its own, so make sure the outer transaction exists.
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute(f"SAVEPOINT {savepoint}")
+    _uow_depth[key] = depth + 1
+    pending = _after_commit.get(key, [])
+    callbacks_before = len(pending)
+    callbacks: list[Callable[[], None]] = []
+    try:
+        yield conn
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            del _after_commit.get(key, [])[callbacks_before:]
+        raise
+    else:
+        if depth == 0:
+            conn.commit()
+            callbacks = _after_commit.get(key, [])
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+    finally:
+        if depth == 0:
+            _uow_depth.pop(key, None)
+            _after_commit.pop(key, None)
+        else:
+            _uow_depth[key] = depth
+    for callback in callbacks:
+        callback()
+
+
+# Repositories call this instead of conn.commit() so that, inside a
+# unit_of_work scope, their writes commit once when the outermost scope ends.
+def commit(conn: sqlite3.Connection) -> None:
+    if not _uow_depth.get(id(conn)):
+        conn.commit()
+
+
+# Runs callback once the current writes are committed: right away outside a
+# unit_of_work, when the outermost scope commits inside one, never on rollback.
+def after_commit(conn: sqlite3.Connection, callback: Callable[[], None]) -> None:
+    key = id(conn)
+    if _uow_depth.get(key):
+        _after_commit.setdefault(key, []).append(callback)
+    else:
+        callback()
+
+
+def _migration_base_schema(conn: sqlite3.Connection) -> None:
+    # IF NOT EXISTS: databases created before versioning already have these.
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS transactions (
@@ -82,4 +209,538 @@ def init_db(conn: sqlite3.Connection) -> None:
         )
         """
     )
-    conn.commit()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scrape_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total_ms REAL NOT NULL,
+            error TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scrape_spans (
+            run_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            elapsed_ms REAL NOT NULL,
+            rows INTEGER,
+            detail TEXT,
+            PRIMARY KEY (run_id, seq),
+            FOREIGN KEY (run_id) REFERENCES scrape_runs (id)
+        )
+        """
+    )
+
+
+def _migration_hot_path_indexes(conn: sqlite3.Connection) -> None:
+    # get_transactions_by_status: WHERE status ORDER BY occurred_at
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_transactions_status_occurred_at
+        ON transactions (status, occurred_at)
+        """
+    )
+    # list_reviews_by_status: WHERE status ORDER BY created_at
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_reviews_status_created_at
+        ON reviews (status, created_at)
+        """
+    )
+    # get_review_by_message, on every Telegram reply
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_reviews_telegram_message
+        ON reviews (telegram_chat_id, telegram_message_id)
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_mp_id ON reviews (mp_id)")
+
+
+def _migration_transactions_keyset_index(conn: sqlite3.Connection) -> None:
+    # Keyset pagination orders by (occurred_at, mp_id); with mp_id in the
+    # index the tie-break needs no temp B-tree. Reviews page on
+    # (created_at, id), and id is the rowid, so their index already covers it.
+    conn.execute("DROP INDEX IF EXISTS idx_transactions_status_occurred_at")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_transactions_status_occurred_at_mp_id
+        ON transactions (status, occurred_at, mp_id)
+        """
+    )
+
+
+def _migration_archive_tables(conn: sqlite3.Connection) -> None:
+    # Finished rows move here (see ArchiveRepository) so status queries on the
+    # hot tables stay small. Columns mirror the hot tables plus archived_at.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transactions_archive (
+            mp_id TEXT PRIMARY KEY,
+            occurred_at TEXT NOT NULL,
+            amount REAL NOT NULL,
+            direction TEXT NOT NULL,
+            description_primary TEXT NOT NULL,
+            description_secondary TEXT NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            raw_json BLOB,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reviews_archive (
+            id INTEGER PRIMARY KEY,
+            mp_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            suggested_description TEXT,
+            suggested_category TEXT,
+            suggested_nickname TEXT,
+            final_description TEXT,
+            final_category TEXT,
+            final_nickname TEXT,
+            telegram_chat_id TEXT,
+            telegram_message_id TEXT,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reviews_archive_mp_id ON reviews_archive (mp_id)"
+    )
+
+
+def _migration_monthly_aggregates(conn: sqlite3.Connection) -> None:
+    # Running totals per month, kept by triggers when a review reaches
+    # "written", i.e. exactly what was appended to the spreadsheet. Spent
+    # amounts use the sheet's sign: refunds (incoming) count as negative.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_category_totals (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, category)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_nickname_deposits (
+            month TEXT NOT NULL,
+            nickname TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, nickname)
+        )
+        """
+    )
+    # "WHERE true" resolves the INSERT ... SELECT ... ON CONFLICT ambiguity.
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_written_spent
+        AFTER UPDATE OF status ON reviews
+        WHEN NEW.status = 'written' AND OLD.status IS NOT 'written' AND NEW.kind = 'spent'
+        BEGIN
+            INSERT INTO monthly_category_totals (month, category, total, count)
+            SELECT substr(t.occurred_at, 1, 7),
+                   COALESCE(NEW.final_category, NEW.suggested_category, ''),
+                   CASE WHEN t.direction = 'out' THEN t.amount ELSE -t.amount END,
+                   1
+            FROM transactions t
+            WHERE t.mp_id = NEW.mp_id AND true
+            ON CONFLICT (month, category) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_written_deposit
+        AFTER UPDATE OF status ON reviews
+        WHEN NEW.status = 'written' AND OLD.status IS NOT 'written' AND NEW.kind = 'deposit'
+        BEGIN
+            INSERT INTO monthly_nickname_deposits (month, nickname, total, count)
+            SELECT substr(t.occurred_at, 1, 7),
+                   COALESCE(NEW.final_nickname, NEW.suggested_nickname, ''),
+                   t.amount,
+                   1
+            FROM transactions t
+            WHERE t.mp_id = NEW.mp_id AND true
+            ON CONFLICT (month, nickname) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        END
+        """
+    )
+    # Backfill from everything already written, archived rows included.
+    review_columns = (
+        "mp_id, kind, final_category, suggested_category, final_nickname, suggested_nickname"
+    )
+    tx_columns = "mp_id, occurred_at, amount, direction"
+    written = f"""
+        SELECT r.*, t.occurred_at, t.amount, t.direction
+        FROM (
+            SELECT {review_columns} FROM reviews WHERE status = 'written'
+            UNION ALL
+            SELECT {review_columns} FROM reviews_archive WHERE status = 'written'
+        ) r
+        JOIN (
+            SELECT {tx_columns} FROM transactions
+            UNION ALL
+            SELECT {tx_columns} FROM transactions_archive
+        ) t ON t.mp_id = r.mp_id
+    """
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO monthly_category_totals (month, category, total, count)
+        SELECT substr(occurred_at, 1, 7), COALESCE(final_category, suggested_category, ''),
+               SUM(CASE WHEN direction = 'out' THEN amount ELSE -amount END), COUNT(*)
+        FROM ({written}) WHERE kind = 'spent'
+        GROUP BY 1, 2
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO monthly_nickname_deposits (month, nickname, total, count)
+        SELECT substr(occurred_at, 1, 7), COALESCE(final_nickname, suggested_nickname, ''),
+               SUM(amount), COUNT(*)
+        FROM ({written}) WHERE kind = 'deposit'
+        GROUP BY 1, 2
+        """
+    )
+
+
+def _migration_transactions_fts(conn: sqlite3.Connection) -> None:
+    # Full-text index over descriptions. remove_diacritics 2 folds accents and
+    # case like encode_name. Rows are never deleted, so archived transactions
+    # stay searchable.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+            mp_id UNINDEXED,
+            occurred_at UNINDEXED,
+            description_primary,
+            description_secondary,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+        AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO transactions_fts
+                (mp_id, occurred_at, description_primary, description_secondary)
+            VALUES
+                (NEW.mp_id, NEW.occurred_at, NEW.description_primary, NEW.description_secondary);
+        END
+        """
+    )
+    for table in ("transactions", "transactions_archive"):
+        conn.execute(
+            f"""
+            INSERT INTO transactions_fts
+                (mp_id, occurred_at, description_primary, description_secondary)
+            SELECT mp_id, occurred_at, description_primary, description_secondary
+            FROM {table}
+            """
+        )
+
+
+def _migration_counterparty_key(conn: sqlite3.Connection) -> None:
+    # Persist encode_name(description_secondary) so rule matching and
+    # reclassification never normalize the same string twice.
+    conn.create_function("encode_name", 1, encode_name, deterministic=True)
+    for table in ("transactions", "transactions_archive"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN counterparty_key TEXT")
+        conn.execute(
+            f"UPDATE {table} SET counterparty_key = encode_name(description_secondary)"
+        )
+
+
+def _migration_category_history(conn: sqlite3.Connection) -> None:
+    # How each counterparty ended up labelled in the spreadsheet, counted per
+    # (description, category). Maintained by a trigger when a spent review
+    # reaches "written", like the monthly totals; SuggestionIndex reads it.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS category_history (
+            counterparty_key TEXT NOT NULL,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            last_written_at TEXT NOT NULL,
+            PRIMARY KEY (counterparty_key, description, category)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_written_history
+        AFTER UPDATE OF status ON reviews
+        WHEN NEW.status = 'written' AND OLD.status IS NOT 'written' AND NEW.kind = 'spent'
+        BEGIN
+            INSERT INTO category_history
+                (counterparty_key, description, category, count, last_written_at)
+            SELECT t.counterparty_key,
+                   COALESCE(NEW.final_description, NEW.suggested_description),
+                   COALESCE(NEW.final_category, NEW.suggested_category),
+                   1,
+                   CURRENT_TIMESTAMP
+            FROM transactions t
+            WHERE t.mp_id = NEW.mp_id
+              AND t.counterparty_key IS NOT NULL
+              AND COALESCE(NEW.final_description, NEW.suggested_description) IS NOT NULL
+              AND COALESCE(NEW.final_category, NEW.suggested_category) IS NOT NULL
+            ON CONFLICT (counterparty_key, description, category) DO UPDATE
+            SET count = count + 1, last_written_at = excluded.last_written_at;
+        END
+        """
+    )
+    for table in ("reviews", "reviews_archive"):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN suggestion_score REAL")
+
+    # Backfill from everything already written, archived rows included.
+    review_columns = (
+        "mp_id, kind, updated_at, final_description, suggested_description, "
+        "final_category, suggested_category"
+    )
+    tx_columns = "mp_id, counterparty_key"
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO category_history
+            (counterparty_key, description, category, count, last_written_at)
+        SELECT t.counterparty_key,
+               COALESCE(r.final_description, r.suggested_description),
+               COALESCE(r.final_category, r.suggested_category),
+               COUNT(*),
+               MAX(r.updated_at)
+        FROM (
+            SELECT {review_columns} FROM reviews WHERE status = 'written'
+            UNION ALL
+            SELECT {review_columns} FROM reviews_archive WHERE status = 'written'
+        ) r
+        JOIN (
+            SELECT {tx_columns} FROM transactions
+            UNION ALL
+            SELECT {tx_columns} FROM transactions_archive
+        ) t ON t.mp_id = r.mp_id
+        WHERE r.kind = 'spent'
+          AND t.counterparty_key IS NOT NULL
+          AND COALESCE(r.final_description, r.suggested_description) IS NOT NULL
+          AND COALESCE(r.final_category, r.suggested_category) IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def _migration_export_order_indexes(conn: sqlite3.Connection) -> None:
+    # The export walks each table in (occurred_at, mp_id) order and merges
+    # the two streams; these indexes give that order without a temp sort.
+    for table in ("transactions", "transactions_archive"):
+        conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{table}_occurred_at_mp_id
+            ON {table} (occurred_at, mp_id)
+            """
+        )
+
+
+def _migration_confirmed_category_history(conn: sqlite3.Connection) -> None:
+    # Auto-approved reviews (a suggestion score but no final_* from the bot)
+    # must not count towards history, or a suggestion would keep confirming
+    # itself. Only reviews a person confirmed, or that never had a
+    # suggestion, are counted; the table is rebuilt with the same filter.
+    conn.execute("DROP TRIGGER IF EXISTS trg_reviews_written_history")
+    conn.execute(
+        """
+        CREATE TRIGGER trg_reviews_written_history
+        AFTER UPDATE OF status ON reviews
+        WHEN NEW.status = 'written' AND OLD.status IS NOT 'written' AND NEW.kind = 'spent'
+            AND (NEW.suggestion_score IS NULL OR NEW.final_category IS NOT NULL)
+        BEGIN
+            INSERT INTO category_history
+                (counterparty_key, description, category, count, last_written_at)
+            SELECT t.counterparty_key,
+                   COALESCE(NEW.final_description, NEW.suggested_description),
+                   COALESCE(NEW.final_category, NEW.suggested_category),
+                   1,
+                   CURRENT_TIMESTAMP
+            FROM transactions t
+            WHERE t.mp_id = NEW.mp_id
+              AND t.counterparty_key IS NOT NULL
+              AND COALESCE(NEW.final_description, NEW.suggested_description) IS NOT NULL
+              AND COALESCE(NEW.final_category, NEW.suggested_category) IS NOT NULL
+            ON CONFLICT (counterparty_key, description, category) DO UPDATE
+            SET count = count + 1, last_written_at = excluded.last_written_at;
+        END
+        """
+    )
+
+    review_columns = (
+        "mp_id, kind, updated_at, final_description, suggested_description, "
+        "final_category, suggested_category, suggestion_score"
+    )
+    tx_columns = "mp_id, counterparty_key"
+    conn.execute("DELETE FROM category_history")
+    conn.execute(
+        f"""
+        INSERT INTO category_history
+            (counterparty_key, description, category, count, last_written_at)
+        SELECT t.counterparty_key,
+               COALESCE(r.final_description, r.suggested_description),
+               COALESCE(r.final_category, r.suggested_category),
+               COUNT(*),
+               MAX(r.updated_at)
+        FROM (
+            SELECT {review_columns} FROM reviews WHERE status = 'written'
+            UNION ALL
+            SELECT {review_columns} FROM reviews_archive WHERE status = 'written'
+        ) r
+        JOIN (
+            SELECT {tx_columns} FROM transactions
+            UNION ALL
+            SELECT {tx_columns} FROM transactions_archive
+        ) t ON t.mp_id = r.mp_id
+        WHERE r.kind = 'spent'
+          AND (r.suggestion_score IS NULL OR r.final_category IS NOT NULL)
+          AND t.counterparty_key IS NOT NULL
+          AND COALESCE(r.final_description, r.suggested_description) IS NOT NULL
+          AND COALESCE(r.final_category, r.suggested_category) IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def _migration_aggregate_triggers(conn: sqlite3.Connection) -> None:
+    # Recreates the monthly-total triggers from migration 4 without its
+    # redundant "AND true". INSERT ... SELECT ... ON CONFLICT needs a WHERE
+    # clause on the SELECT so the parser does not read ON CONFLICT as a join
+    # constraint, and the mp_id filter already is one. Same behaviour.
+    conn.execute("DROP TRIGGER IF EXISTS trg_reviews_written_spent")
+    conn.execute(
+        """
+        CREATE TRIGGER trg_reviews_written_spent
+        AFTER UPDATE OF status ON reviews
+        WHEN NEW.status = 'written' AND OLD.status IS NOT 'written' AND NEW.kind = 'spent'
+        BEGIN
+            INSERT INTO monthly_category_totals (month, category, total, count)
+            SELECT substr(t.occurred_at, 1, 7),
+                   COALESCE(NEW.final_category, NEW.suggested_category, ''),
+                   CASE WHEN t.direction = 'out' THEN t.amount ELSE -t.amount END,
+                   1
+            FROM transactions t
+            WHERE t.mp_id = NEW.mp_id
+            ON CONFLICT (month, category) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        END
+        """
+    )
+    conn.execute("DROP TRIGGER IF EXISTS trg_reviews_written_deposit")
+    conn.execute(
+        """
+        CREATE TRIGGER trg_reviews_written_deposit
+        AFTER UPDATE OF status ON reviews
+        WHEN NEW.status = 'written' AND OLD.status IS NOT 'written' AND NEW.kind = 'deposit'
+        BEGIN
+            INSERT INTO monthly_nickname_deposits (month, nickname, total, count)
+            SELECT substr(t.occurred_at, 1, 7),
+                   COALESCE(NEW.final_nickname, NEW.suggested_nickname, ''),
+                   t.amount,
+                   1
+            FROM transactions t
+            WHERE t.mp_id = NEW.mp_id
+            ON CONFLICT (month, nickname) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        END
+        """
+    )
+
+
+# Append-only: MIGRATIONS[i] upgrades a database from user_version i to i + 1.
+MIGRATIONS = [
+    _migration_base_schema,
+    _migration_hot_path_indexes,
+    _migration_transactions_keyset_index,
+    _migration_archive_tables,
+    _migration_monthly_aggregates,
+    _migration_transactions_fts,
+    _migration_counterparty_key,
+    _migration_category_history,
+    _migration_export_order_indexes,
+    _migration_confirmed_category_history,
+    _migration_aggregate_triggers,
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int | None = None) -> int:
+    target = len(MIGRATIONS) if target is None else target
+    version = schema_version(conn)
+    if version >= target:
+        return version
+    if conn.in_transaction:
+        conn.commit()
+    while version < target:
+        # IMMEDIATE takes the write lock before re-reading the version, so
+        # the runner and bot threads never apply the same step twice. Each
+        # step commits with its version bump.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = schema_version(conn)
+            if version < target:
+                MIGRATIONS[version](conn)
+                version += 1
+                conn.execute(f"PRAGMA user_version = {version}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+    return version
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    # auto_vacuum can only be switched on by a full VACUUM, so this rewrites
+    # the file once; afterwards incremental_vacuum() releases free pages.
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int | None = None) -> int:
+    if conn.in_transaction:
+        conn.commit()
+    free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    pragma = "PRAGMA incremental_vacuum"
+    if pages is not None:
+        pragma += f"({int(pages)})"
+    # The pragma frees one page per step, so it has to be fully consumed.
+    conn.execute(pragma).fetchall()
+    return free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def init_db(conn: sqlite3.Connection) -> None:
+    migrate(conn)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class ReviewStatusChanged:
+    review_ids: tuple[int, ...]
+    status: str
+
+
+class EventBus:
+    # In-process only: the runner, the bot thread and the jobs share one
+    # process. Repositories publish after their write commits, on the
+    # committing thread, so handlers must be quick (e.g. set an Event).
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._handlers: dict[type, list[Callable]] = {}
+
+    def subscribe(self, event_type: type, handler: Callable) -> Callable[[], None]:
+        with self._lock:
+            self._handlers.setdefault(event_type, []).append(handler)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                handlers = self._handlers.get(event_type, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+
+        return unsubscribe
+
+    def publish(self, event) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(type(event), []))
+        for handler in handlers:
+            # The write already committed; a failing subscriber must not
+            # surface as a failed write.
+            try:
+                handler(event)
+            except Exception as exc:
+                print(f"[events] {type(event).__name__} handler failed: {exc}")
+
+
+bus = EventBus()
@@ -1,15 +1,86 @@
 from __future__ import annotations
 
+import heapq
+import re
 import sqlite3
-from typing import Iterable
+import zlib
+from contextlib import AbstractContextManager
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, TypeVar
 
 from app.domain.models import Review, Transaction
+from app.metrics.timing import SpanRecorder
+from app.processing.name_utils import encode_name
+from app.storage.db import after_commit, commit, unit_of_work
+from app.storage.events import ReviewStatusChanged, bus
+
+T = TypeVar("T")
+
+ITER_CHUNK_SIZE = 500
+
+FINISHED_TRANSACTION_STATUSES = ("sent", "ignored")
+FINISHED_REVIEW_STATUSES = ("written", "cancelled")
+
+_TRANSACTION_COLUMNS = (
+    "mp_id, occurred_at, amount, direction, description_primary, description_secondary, "
+    "description, status, attempts, last_error, raw_json, created_at, updated_at, "
+    "counterparty_key"
+)
+_REVIEW_COLUMNS = (
+    "id, mp_id, kind, status, suggested_description, suggested_category, "
+    "suggested_nickname, final_description, final_category, final_nickname, "
+    "telegram_chat_id, telegram_message_id, last_error, created_at, updated_at, "
+    "suggestion_score"
+)
+
+
+def _fts_query(text: str) -> str:
+    # Every word must match as a prefix; quoting keeps FTS5 operators and
+    # punctuation in user input from being parsed as query syntax.
+    words = re.findall(r"\w+", encode_name(text))
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _encode_raw_json(raw_json: str | None) -> bytes | None:
+    # The raw payload is only kept for debugging and re-mapping, so it is
+    # stored zlib-compressed in a BLOB.
+    if raw_json is None:
+        return None
+    return zlib.compress(raw_json.encode("utf-8"))
+
+
+def _decode_raw_json(value: bytes | str | None) -> str | None:
+    # Rows written before compression still hold plain TEXT.
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+def _iter_keyset(
+    fetch: Callable[[int, tuple | None], list[T]],
+    key: Callable[[T], tuple],
+    chunk_size: int,
+) -> Iterator[T]:
+    # Each chunk is a fresh query that resumes after the last key seen, so
+    # callers may update the rows they are iterating over and memory stays
+    # bounded by chunk_size.
+    after = None
+    while True:
+        chunk = fetch(chunk_size, after)
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        after = key(chunk[-1])
 
 
 class TransactionRepository:
     def __init__(self, conn: sqlite3.Connection):
         self._conn = conn
 
+    def transaction(self) -> AbstractContextManager[sqlite3.Connection]:
+        return unit_of_work(self._conn)
+
     def insert_transactions(self, transactions: Iterable[Transaction]) -> int:
         rows = [
             (
@@ -20,51 +91,77 @@ class TransactionRepository:
                 t.description_primary,
                 t.description_secondary,
                 t.description,
-                t.raw_json,
+                _encode_raw_json(t.raw_json),
+                t.counterparty_key or encode_name(t.description_secondary),
+                t.mp_id,
             )
             for t in transactions
         ]
         if not rows:
             return 0
+        # Archived transactions must not come back as new when a backfill
+        # pages over them again.
         cur = self._conn.executemany(
             """
             INSERT OR IGNORE INTO transactions
-                (mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json)
-            VALUES
-                (?, ?, ?, ?, ?, ?, ?, ?)
+                (mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key)
+            SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM transactions_archive WHERE mp_id = ?)
             """,
             rows,
         )
-        self._conn.commit()
+        commit(self._conn)
         return cur.rowcount or 0
 
     def get_pending_transactions(self, limit: int = 50) -> list[Transaction]:
         return self.get_transactions_by_status("new", limit)
 
-    def get_transactions_by_status(self, status: str, limit: int = 50) -> list[Transaction]:
+    def get_transactions_by_status(
+        self,
+        status: str,
+        limit: int = 50,
+        after: tuple[str, str] | None = None,
+    ) -> list[Transaction]:
+        # Keyset pagination: pass the (occurred_at, mp_id) of the last row seen.
+        if after is None:
+            after = ("", "")
         cur = self._conn.execute(
             """
-            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json
+            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
             FROM transactions
-            WHERE status = ?
-            ORDER BY occurred_at ASC
+            WHERE status = ? AND (occurred_at, mp_id) > (?, ?)
+            ORDER BY occurred_at ASC, mp_id ASC
             LIMIT ?
             """,
-            (status, limit),
-        )
-        return [
-            Transaction(
-                mp_id=row["mp_id"],
-                occurred_at=row["occurred_at"],
-                amount=row["amount"],
-                direction=row["direction"],
-                description_primary=row["description_primary"],
-                description_secondary=row["description_secondary"],
-                description=row["description"] or "",
-                raw_json=row["raw_json"],
-            )
-            for row in cur.fetchall()
-        ]
+            (status, after[0], after[1], limit),
+        )
+        return [self._row_to_transaction(row) for row in cur.fetchall()]
+
+    def iter_transactions_by_status(
+        self, status: str, chunk_size: int = ITER_CHUNK_SIZE
+    ) -> Iterator[Transaction]:
+        return _iter_keyset(
+            lambda limit, after: self.get_transactions_by_status(status, limit, after),
+            lambda tx: (tx.occurred_at, tx.mp_id),
+            chunk_size,
+        )
+
+    def get_latest_transaction(self) -> Transaction | None:
+        cur = self._conn.execute(
+            """
+            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
+            FROM transactions
+            UNION ALL
+            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
+            FROM transactions_archive
+            ORDER BY occurred_at DESC
+            LIMIT 1
+            """
+        )
+        row = cur.fetchone()
+        if not row:
+            return None
+        return self._row_to_transaction(row)
 
     def set_status(self, mp_id: str, status: str) -> None:
         self._conn.execute(
@@ -75,7 +172,7 @@ class TransactionRepository:
             """,
             (status, mp_id),
         )
-        self._conn.commit()
+        commit(self._conn)
 
     def set_status_batch(self, mp_ids: Iterable[str], status: str) -> int:
         ids = list(mp_ids)
@@ -89,21 +186,68 @@ class TransactionRepository:
             """,
             [(status, mp_id) for mp_id in ids],
         )
-        self._conn.commit()
+        commit(self._conn)
         return cur.rowcount or 0
 
     def get_transaction(self, mp_id: str) -> Transaction | None:
         cur = self._conn.execute(
             """
-            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json
+            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
             FROM transactions
             WHERE mp_id = ?
             """,
             (mp_id,),
         )
         row = cur.fetchone()
+        if not row:
+            cur = self._conn.execute(
+                """
+                SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
+                FROM transactions_archive
+                WHERE mp_id = ?
+                """,
+                (mp_id,),
+            )
+            row = cur.fetchone()
         if not row:
             return None
+        return self._row_to_transaction(row)
+
+    def search_transactions(
+        self, text: str, limit: int = 10, offset: int = 0
+    ) -> list[Transaction]:
+        query = _fts_query(text)
+        if not query:
+            return []
+        ids = [
+            row["mp_id"]
+            for row in self._conn.execute(
+                """
+                SELECT mp_id FROM transactions_fts
+                WHERE transactions_fts MATCH ?
+                ORDER BY rank, occurred_at DESC
+                LIMIT ? OFFSET ?
+                """,
+                (query, limit, offset),
+            )
+        ]
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        cur = self._conn.execute(
+            f"""
+            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
+            FROM transactions WHERE mp_id IN ({placeholders})
+            UNION ALL
+            SELECT mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, raw_json, counterparty_key
+            FROM transactions_archive WHERE mp_id IN ({placeholders})
+            """,
+            (*ids, *ids),
+        )
+        found = {row["mp_id"]: self._row_to_transaction(row) for row in cur.fetchall()}
+        return [found[mp_id] for mp_id in ids if mp_id in found]
+
+    def _row_to_transaction(self, row: sqlite3.Row) -> Transaction:
         return Transaction(
             mp_id=row["mp_id"],
             occurred_at=row["occurred_at"],
@@ -112,7 +256,8 @@ class TransactionRepository:
             description_primary=row["description_primary"],
             description_secondary=row["description_secondary"],
             description=row["description"] or "",
-            raw_json=row["raw_json"],
+            raw_json=_decode_raw_json(row["raw_json"]),
+            counterparty_key=row["counterparty_key"],
         )
 
     def mark_sent_batch(self, mp_ids: Iterable[str]) -> int:
@@ -127,7 +272,7 @@ class TransactionRepository:
             """,
             [(mp_id,) for mp_id in ids],
         )
-        self._conn.commit()
+        commit(self._conn)
         return cur.rowcount or 0
 
     def mark_failed(self, mp_id: str, error: str) -> None:
@@ -142,7 +287,7 @@ class TransactionRepository:
             """,
             (error, mp_id),
         )
-        self._conn.commit()
+        commit(self._conn)
 
     def mark_failed_batch(self, mp_ids: Iterable[str], error: str) -> int:
         ids = list(mp_ids)
@@ -159,7 +304,7 @@ class TransactionRepository:
             """,
             [(error, mp_id) for mp_id in ids],
         )
-        self._conn.commit()
+        commit(self._conn)
         return cur.rowcount or 0
 
     def load_state(self, key: str) -> str | None:
@@ -176,13 +321,16 @@ class TransactionRepository:
             """,
             (key, value),
         )
-        self._conn.commit()
+        commit(self._conn)
 
 
 class ReviewRepository:
     def __init__(self, conn: sqlite3.Connection):
         self._conn = conn
 
+    def transaction(self) -> AbstractContextManager[sqlite3.Connection]:
+        return unit_of_work(self._conn)
+
     def create_review(self, review: Review) -> int:
         cur = self._conn.execute(
             """
@@ -197,9 +345,10 @@ class ReviewRepository:
                 final_category,
                 final_nickname,
                 telegram_chat_id,
-                telegram_message_id
+                telegram_message_id,
+                suggestion_score
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 review.mp_id,
@@ -213,11 +362,65 @@ class ReviewRepository:
                 review.final_nickname,
                 review.telegram_chat_id,
                 review.telegram_message_id,
+                review.suggestion_score,
             ),
         )
-        self._conn.commit()
+        commit(self._conn)
         return int(cur.lastrowid)
 
+    def create_reviews(self, reviews: Iterable[Review]) -> int:
+        rows = [
+            (
+                review.mp_id,
+                review.kind,
+                review.status,
+                review.suggested_description,
+                review.suggested_category,
+                review.suggested_nickname,
+                review.final_description,
+                review.final_category,
+                review.final_nickname,
+                review.telegram_chat_id,
+                review.telegram_message_id,
+                review.suggestion_score,
+            )
+            for review in reviews
+        ]
+        if not rows:
+            return 0
+        cur = self._conn.executemany(
+            """
+            INSERT INTO reviews (
+                mp_id,
+                kind,
+                status,
+                suggested_description,
+                suggested_category,
+                suggested_nickname,
+                final_description,
+                final_category,
+                final_nickname,
+                telegram_chat_id,
+                telegram_message_id,
+                suggestion_score
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        commit(self._conn)
+        # Reviews created already past pending_send (auto-approved) are
+        # announced like a status change, so the runner writes them promptly.
+        for status in {row[2] for row in rows} - {"pending_send"}:
+            mp_ids = [row[0] for row in rows if row[2] == status]
+            placeholders = ",".join("?" * len(mp_ids))
+            ids = self._conn.execute(
+                f"SELECT id FROM reviews WHERE status = ? AND mp_id IN ({placeholders})",
+                (status, *mp_ids),
+            ).fetchall()
+            self._publish_status(tuple(row["id"] for row in ids), status)
+        return cur.rowcount or 0
+
     def update_review_status(self, review_id: int, status: str) -> None:
         self._conn.execute(
             """
@@ -227,7 +430,87 @@ class ReviewRepository:
             """,
             (status, review_id),
         )
-        self._conn.commit()
+        commit(self._conn)
+        self._publish_status((review_id,), status)
+
+    def update_review_status_batch(self, review_ids: Iterable[int], status: str) -> int:
+        ids = list(review_ids)
+        if not ids:
+            return 0
+        cur = self._conn.executemany(
+            """
+            UPDATE reviews
+            SET status = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            [(status, review_id) for review_id in ids],
+        )
+        commit(self._conn)
+        self._publish_status(tuple(ids), status)
+        return cur.rowcount or 0
+
+    def _publish_status(self, review_ids: tuple[int, ...], status: str) -> None:
+        event = ReviewStatusChanged(review_ids, status)
+        after_commit(self._conn, lambda: bus.publish(event))
+
+    def has_reviews_with_status(self, status: str) -> bool:
+        cur = self._conn.execute(
+            "SELECT 1 FROM reviews WHERE status = ? LIMIT 1", (status,)
+        )
+        return cur.fetchone() is not None
+
+    def category_history(self) -> list[sqlite3.Row]:
+        # Input for SuggestionIndex.build, most recently written first.
+        return self._conn.execute(
+            """
+            SELECT counterparty_key, description, category, count
+            FROM category_history
+            ORDER BY last_written_at DESC
+            """
+        ).fetchall()
+
+    def update_review_suggestions_batch(
+        self,
+        rows: Iterable[tuple[int, str, str | None, str | None, str | None, float | None]],
+    ) -> int:
+        # rows: (review_id, kind, description, category, nickname, score)
+        params = [
+            (kind, description, category, nickname, score, review_id)
+            for review_id, kind, description, category, nickname, score in rows
+        ]
+        if not params:
+            return 0
+        cur = self._conn.executemany(
+            """
+            UPDATE reviews
+            SET kind = ?, suggested_description = ?, suggested_category = ?,
+                suggested_nickname = ?, suggestion_score = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            params,
+        )
+        commit(self._conn)
+        return cur.rowcount or 0
+
+    def classification_cursor(self, statuses: Iterable[str]) -> sqlite3.Cursor:
+        # Column-oriented input for bulk reclassification; the caller reads
+        # the cursor straight into a DataFrame. Archived reviews are not
+        # included.
+        statuses = list(statuses)
+        placeholders = ",".join("?" * len(statuses))
+        return self._conn.execute(
+            f"""
+            SELECT r.id AS review_id, r.status, r.kind, r.suggested_description,
+                   r.suggested_category, r.suggested_nickname, r.suggestion_score,
+                   t.mp_id, t.description_primary, t.description_secondary,
+                   t.counterparty_key, t.amount, t.direction
+            FROM reviews r
+            JOIN transactions t ON t.mp_id = r.mp_id
+            WHERE r.status IN ({placeholders})
+            ORDER BY r.id
+            """,
+            statuses,
+        )
 
     def update_review_telegram(
         self, review_id: int, chat_id: str, message_id: str
@@ -240,7 +523,7 @@ class ReviewRepository:
             """,
             (chat_id, message_id, review_id),
         )
-        self._conn.commit()
+        commit(self._conn)
 
     def update_review_final(
         self,
@@ -258,7 +541,7 @@ class ReviewRepository:
             """,
             (final_description, final_category, final_nickname, review_id),
         )
-        self._conn.commit()
+        commit(self._conn)
 
     def update_review_error(self, review_id: int, error: str) -> None:
         self._conn.execute(
@@ -269,29 +552,48 @@ class ReviewRepository:
             """,
             (error, review_id),
         )
-        self._conn.commit()
+        commit(self._conn)
 
-    def list_reviews_by_status(self, status: str, limit: int = 50) -> list[Review]:
+    def list_reviews_by_status(
+        self,
+        status: str,
+        limit: int = 50,
+        after: tuple[str, int] | None = None,
+    ) -> list[Review]:
+        # Keyset pagination: pass the (created_at, id) of the last review seen.
+        if after is None:
+            after = ("", 0)
         cur = self._conn.execute(
             """
             SELECT id, mp_id, kind, status, suggested_description, suggested_category,
                    suggested_nickname, final_description, final_category, final_nickname,
-                   telegram_chat_id, telegram_message_id, last_error, created_at, updated_at
+                   telegram_chat_id, telegram_message_id, last_error, created_at, updated_at,
+                   suggestion_score
             FROM reviews
-            WHERE status = ?
-            ORDER BY created_at ASC
+            WHERE status = ? AND (created_at, id) > (?, ?)
+            ORDER BY created_at ASC, id ASC
             LIMIT ?
             """,
-            (status, limit),
+            (status, after[0], after[1], limit),
         )
         return [self._row_to_review(row) for row in cur.fetchall()]
 
+    def iter_reviews_by_status(
+        self, status: str, chunk_size: int = ITER_CHUNK_SIZE
+    ) -> Iterator[Review]:
+        return _iter_keyset(
+            lambda limit, after: self.list_reviews_by_status(status, limit, after),
+            lambda review: (review.created_at, review.id),
+            chunk_size,
+        )
+
     def get_review(self, review_id: int) -> Review | None:
         cur = self._conn.execute(
             """
             SELECT id, mp_id, kind, status, suggested_description, suggested_category,
                    suggested_nickname, final_description, final_category, final_nickname,
-                   telegram_chat_id, telegram_message_id, last_error, created_at, updated_at
+                   telegram_chat_id, telegram_message_id, last_error, created_at, updated_at,
+                   suggestion_score
             FROM reviews
             WHERE id = ?
             """,
@@ -305,7 +607,8 @@ class ReviewRepository:
             """
             SELECT id, mp_id, kind, status, suggested_description, suggested_category,
                    suggested_nickname, final_description, final_category, final_nickname,
-                   telegram_chat_id, telegram_message_id, last_error, created_at, updated_at
+                   telegram_chat_id, telegram_message_id, last_error, created_at, updated_at,
+                   suggestion_score
             FROM reviews
             WHERE telegram_chat_id = ? AND telegram_message_id = ?
             """,
@@ -314,6 +617,75 @@ class ReviewRepository:
         row = cur.fetchone()
         return self._row_to_review(row) if row else None
 
+    _REVIEW_WITH_TRANSACTION_SELECT = """
+        SELECT r.id, r.mp_id, r.kind, r.status, r.suggested_description, r.suggested_category,
+               r.suggested_nickname, r.final_description, r.final_category, r.final_nickname,
+               r.telegram_chat_id, r.telegram_message_id, r.last_error, r.created_at, r.updated_at,
+               r.suggestion_score,
+               t.mp_id AS tx_mp_id, t.occurred_at AS tx_occurred_at, t.amount AS tx_amount,
+               t.direction AS tx_direction, t.description_primary AS tx_description_primary,
+               t.description_secondary AS tx_description_secondary,
+               t.description AS tx_description, t.raw_json AS tx_raw_json,
+               t.counterparty_key AS tx_counterparty_key
+        FROM reviews r
+        LEFT JOIN transactions t ON t.mp_id = r.mp_id
+    """
+
+    def list_reviews_with_transactions(
+        self,
+        status: str,
+        limit: int = 50,
+        after: tuple[str, int] | None = None,
+    ) -> list[tuple[Review, Transaction | None]]:
+        # Keyset pagination: pass the (created_at, id) of the last review seen.
+        if after is None:
+            after = ("", 0)
+        cur = self._conn.execute(
+            self._REVIEW_WITH_TRANSACTION_SELECT
+            + """
+            WHERE r.status = ? AND (r.created_at, r.id) > (?, ?)
+            ORDER BY r.created_at ASC, r.id ASC
+            LIMIT ?
+            """,
+            (status, after[0], after[1], limit),
+        )
+        return [self._row_to_pair(row) for row in cur.fetchall()]
+
+    def iter_reviews_with_transactions(
+        self, status: str, chunk_size: int = ITER_CHUNK_SIZE
+    ) -> Iterator[tuple[Review, Transaction | None]]:
+        return _iter_keyset(
+            lambda limit, after: self.list_reviews_with_transactions(status, limit, after),
+            lambda pair: (pair[0].created_at, pair[0].id),
+            chunk_size,
+        )
+
+    def get_review_with_transaction(
+        self, review_id: int
+    ) -> tuple[Review | None, Transaction | None]:
+        cur = self._conn.execute(
+            self._REVIEW_WITH_TRANSACTION_SELECT + " WHERE r.id = ?",
+            (review_id,),
+        )
+        row = cur.fetchone()
+        return self._row_to_pair(row) if row else (None, None)
+
+    def _row_to_pair(self, row: sqlite3.Row) -> tuple[Review, Transaction | None]:
+        transaction = None
+        if row["tx_mp_id"] is not None:
+            transaction = Transaction(
+                mp_id=row["tx_mp_id"],
+                occurred_at=row["tx_occurred_at"],
+                amount=row["tx_amount"],
+                direction=row["tx_direction"],
+                description_primary=row["tx_description_primary"],
+                description_secondary=row["tx_description_secondary"],
+                description=row["tx_description"] or "",
+                raw_json=_decode_raw_json(row["tx_raw_json"]),
+                counterparty_key=row["tx_counterparty_key"],
+            )
+        return self._row_to_review(row), transaction
+
     def _row_to_review(self, row: sqlite3.Row) -> Review:
         return Review(
             id=row["id"],
@@ -331,4 +703,209 @@ class ReviewRepository:
             last_error=row["last_error"],
             created_at=row["created_at"],
             updated_at=row["updated_at"],
+            suggestion_score=row["suggestion_score"],
+        )
+
+
+class ArchiveRepository:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def archive_finished(self, older_than_days: int) -> tuple[int, int]:
+        # CURRENT_TIMESTAMP is UTC; one cutoff keeps the copy and the delete
+        # selecting the same rows.
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        review_statuses = ",".join("?" * len(FINISHED_REVIEW_STATUSES))
+        tx_statuses = ",".join("?" * len(FINISHED_TRANSACTION_STATUSES))
+        with unit_of_work(self._conn):
+            review_where = f"status IN ({review_statuses}) AND updated_at < ?"
+            review_params = (*FINISHED_REVIEW_STATUSES, cutoff)
+            self._conn.execute(
+                f"""
+                INSERT OR REPLACE INTO reviews_archive ({_REVIEW_COLUMNS})
+                SELECT {_REVIEW_COLUMNS} FROM reviews WHERE {review_where}
+                """,
+                review_params,
+            )
+            reviews = self._conn.execute(
+                f"DELETE FROM reviews WHERE {review_where}", review_params
+            ).rowcount
+
+            # Keep transactions that a review in the hot table still points
+            # to, so the review join keeps finding them.
+            tx_where = f"""
+                status IN ({tx_statuses}) AND updated_at < ?
+                AND NOT EXISTS (SELECT 1 FROM reviews r WHERE r.mp_id = transactions.mp_id)
+            """
+            tx_params = (*FINISHED_TRANSACTION_STATUSES, cutoff)
+            self._conn.execute(
+                f"""
+                INSERT OR REPLACE INTO transactions_archive ({_TRANSACTION_COLUMNS})
+                SELECT {_TRANSACTION_COLUMNS} FROM transactions WHERE {tx_where}
+                """,
+                tx_params,
+            )
+            transactions = self._conn.execute(
+                f"DELETE FROM transactions WHERE {tx_where}", tx_params
+            ).rowcount
+        return transactions, reviews
+
+    def compress_raw_json(self, batch_size: int = ITER_CHUNK_SIZE) -> int:
+        # Re-encodes payloads stored as TEXT before compression was added.
+        compressed = 0
+        for table in ("transactions", "transactions_archive"):
+            while True:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT mp_id, raw_json FROM {table}
+                    WHERE typeof(raw_json) = 'text'
+                    LIMIT ?
+                    """,
+                    (batch_size,),
+                ).fetchall()
+                if not rows:
+                    break
+                with unit_of_work(self._conn):
+                    self._conn.executemany(
+                        f"UPDATE {table} SET raw_json = ? WHERE mp_id = ?",
+                        [(_encode_raw_json(row["raw_json"]), row["mp_id"]) for row in rows],
+                    )
+                compressed += len(rows)
+        return compressed
+
+
+class ReportRepository:
+    EXPORT_COLUMNS = (
+        "mp_id",
+        "occurred_at",
+        "amount",
+        "direction",
+        "description",
+        "transaction_status",
+        "review_id",
+        "kind",
+        "review_status",
+        "final_description",
+        "category",
+        "nickname",
+    )
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def _iter_export_rows(self, table: str, chunk_size: int) -> Iterator[sqlite3.Row]:
+        # Walks one table in index order, so SQLite streams rows instead of
+        # sorting the whole table first. A transaction's review is looked up
+        # in the hot table, then in the archive.
+        cur = self._conn.execute(
+            f"""
+            SELECT t.mp_id, t.occurred_at, t.amount, t.direction, t.description,
+                   t.status AS transaction_status,
+                   COALESCE(r.id, ra.id) AS review_id,
+                   COALESCE(r.kind, ra.kind) AS kind,
+                   COALESCE(r.status, ra.status) AS review_status,
+                   COALESCE(r.final_description, r.suggested_description,
+                            ra.final_description, ra.suggested_description) AS final_description,
+                   COALESCE(r.final_category, r.suggested_category,
+                            ra.final_category, ra.suggested_category) AS category,
+                   COALESCE(r.final_nickname, r.suggested_nickname,
+                            ra.final_nickname, ra.suggested_nickname) AS nickname
+            FROM {table} t
+            LEFT JOIN reviews r ON r.mp_id = t.mp_id
+            LEFT JOIN reviews_archive ra ON ra.mp_id = t.mp_id AND r.id IS NULL
+            ORDER BY t.occurred_at ASC, t.mp_id ASC
+            """
+        )
+        while chunk := cur.fetchmany(chunk_size):
+            yield from chunk
+
+    def iter_export_chunks(
+        self, chunk_size: int = ITER_CHUNK_SIZE
+    ) -> Iterator[list[sqlite3.Row]]:
+        # Hot and archived rows overlap in time (unfinished transactions stay
+        # hot), so the two ordered streams are merged rather than chained.
+        # Memory stays at about one chunk per table, and WAL keeps writers
+        # unblocked while the export runs.
+        rows = heapq.merge(
+            self._iter_export_rows("transactions", chunk_size),
+            self._iter_export_rows("transactions_archive", chunk_size),
+            key=lambda row: (row["occurred_at"], row["mp_id"]),
+        )
+        while chunk := list(islice(rows, chunk_size)):
+            yield chunk
+
+    def monthly_category_totals(self, since_month: str | None = None) -> list[sqlite3.Row]:
+        cur = self._conn.execute(
+            """
+            SELECT month, category, total, count
+            FROM monthly_category_totals
+            WHERE month >= ?
+            ORDER BY month ASC, total DESC
+            """,
+            (since_month or "",),
+        )
+        return cur.fetchall()
+
+    def monthly_nickname_deposits(self, since_month: str | None = None) -> list[sqlite3.Row]:
+        cur = self._conn.execute(
+            """
+            SELECT month, nickname, total, count
+            FROM monthly_nickname_deposits
+            WHERE month >= ?
+            ORDER BY month ASC, total DESC
+            """,
+            (since_month or "",),
+        )
+        return cur.fetchall()
+
+
+class ScrapeRunRepository:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def save_run(
+        self, recorder: SpanRecorder, status: str, error: str | None = None
+    ) -> int:
+        cur = self._conn.execute(
+            """
+            INSERT INTO scrape_runs (started_at, status, total_ms, error)
+            VALUES (?, ?, ?, ?)
+            """,
+            (
+                recorder.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                status,
+                recorder.total_ms,
+                error,
+            ),
+        )
+        run_id = int(cur.lastrowid)
+        self._conn.executemany(
+            """
+            INSERT INTO scrape_spans (run_id, seq, name, elapsed_ms, rows, detail)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (run_id, seq, span.name, span.elapsed_ms, span.rows, span.detail)
+                for seq, span in enumerate(recorder.spans)
+            ],
+        )
+        commit(self._conn)
+        return run_id
+
+    def stage_averages(self, last_runs: int = 10) -> list[sqlite3.Row]:
+        cur = self._conn.execute(
+            """
+            SELECT s.name, COUNT(*) AS samples, AVG(s.elapsed_ms) AS avg_ms,
+                   SUM(s.rows) * 1000.0 / NULLIF(SUM(s.elapsed_ms), 0) AS rows_per_s
+            FROM scrape_spans s
+            WHERE s.run_id IN (
+                SELECT id FROM scrape_runs WHERE status = 'ok' ORDER BY id DESC LIMIT ?
+            )
+            GROUP BY s.name
+            ORDER BY MIN(s.seq)
+            """,
+            (last_runs,),
         )
+        return cur.fetchall()
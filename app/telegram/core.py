@@ -19,7 +19,11 @@ class TelegramCore:
         )
 
     async def _bot_main(self):
-        self._app = Application.builder().token(self._token).build()
+        # Handlers await their I/O, so updates are processed concurrently
+        # instead of one at a time.
+        self._app = (
+            Application.builder().token(self._token).concurrent_updates(True).build()
+        )
         self.set_handlers()
         self._stop_evt = asyncio.Event()
 
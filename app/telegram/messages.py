@@ -4,6 +4,10 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from app.domain.models import Review, Transaction
 
+SEARCH_PAGE_SIZE = 5
+# Telegram caps callback_data at 64 bytes; the query travels in it.
+SEARCH_QUERY_MAX_BYTES = 64 - len("SEARCH:9999:")
+
 
 def _make_keyboard_for_review(review: Review) -> InlineKeyboardMarkup:
     if review.kind == "deposit":
@@ -34,6 +38,20 @@ def _review_category(review: Review) -> str:
     return review.final_category or review.suggested_category or "Categoria pendente"
 
 
+def _suggestion_note(review: Review) -> str:
+    score = review.suggestion_score
+    if review.kind == "deposit":
+        # Exact payer names need no note; fuzzy ones always score below 1.0
+        # and show how close they were.
+        if score is None or score >= 1.0:
+            return ""
+        return f"\n🔎 Nome parecido ({score:.0%})"
+    # Hidden once the user has edited the suggestion.
+    if score is None or review.final_description or review.final_category:
+        return ""
+    return f"\n🔎 Sugestão pelo histórico ({score:.0%})"
+
+
 def _amount_display(transaction: Transaction, kind: str) -> float:
     if kind == "deposit":
         return transaction.amount
@@ -54,7 +72,7 @@ def build_review_message(
     if review.kind == "deposit":
         text = (
             "💰 Depósito 💰\n"
-            f"{amount_str} {review.suggested_nickname}\n\n"
+            f"{amount_str} {review.suggested_nickname}{_suggestion_note(review)}\n\n"
             f"{transaction.description_primary}\n"
             f"{transaction.description_secondary}"
         )
@@ -62,7 +80,7 @@ def build_review_message(
         text = (
             "💸 Gasto 💸\n"
             f"{amount_str} {category}\n"
-            f"{description}\n\n"
+            f"{description}{_suggestion_note(review)}\n\n"
             f"{transaction.description_primary}\n"
             f"{transaction.description_secondary}"
         )
@@ -91,6 +109,35 @@ def build_status_message(review: Review, transaction: Transaction, status: str)
     return f"{body}\n\n{status}"
 
 
+def clip_search_query(text: str) -> str:
+    data = text.strip().encode("utf-8")[:SEARCH_QUERY_MAX_BYTES]
+    return data.decode("utf-8", "ignore").strip()
+
+
+def build_search_message(
+    query: str, transactions: list[Transaction], page: int, has_next: bool
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    if not transactions:
+        return f"Nenhuma transação encontrada para \"{query}\".", None
+
+    lines = [f"🔎 {query} (página {page + 1})"]
+    for tx in transactions:
+        sign = "-" if tx.direction == "out" else "+"
+        lines.append(
+            f"\n{tx.occurred_at} {sign}R$ {tx.amount:.2f}\n"
+            f"{tx.description_primary}\n"
+            f"{tx.description_secondary}".rstrip()
+        )
+
+    buttons: list[InlineKeyboardButton] = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("◀️", callback_data=f"SEARCH:{page - 1}:{query}"))
+    if has_next:
+        buttons.append(InlineKeyboardButton("▶️", callback_data=f"SEARCH:{page + 1}:{query}"))
+    keyboard = InlineKeyboardMarkup([buttons]) if buttons else None
+    return "\n".join(lines), keyboard
+
+
 def build_category_keyboard(review_id: int, categories: list[str]) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
     row: list[InlineKeyboardButton] = []
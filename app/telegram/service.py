@@ -12,10 +12,17 @@ from telegram.ext import (
     filters,
 )
 
-from app.storage.db import get_connection
-from app.storage.repo import ReviewRepository, TransactionRepository
+from app.storage.async_repo import AsyncDatabase
+from app.storage.repo import ReviewRepository
 from app.telegram.core import TelegramCore
-from app.telegram.messages import build_category_keyboard, build_review_message, build_status_message
+from app.telegram.messages import (
+    SEARCH_PAGE_SIZE,
+    build_category_keyboard,
+    build_review_message,
+    build_search_message,
+    build_status_message,
+    clip_search_query,
+)
 
 
 class TelegramReviewBot(TelegramCore):
@@ -23,10 +30,18 @@ class TelegramReviewBot(TelegramCore):
         super().__init__(token)
         self._categories = categories
         self._allowed_chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        self._db = AsyncDatabase()
+        self._reviews = self._db.reviews()
+        self._transactions = self._db.transactions()
+
+    def stop(self, timeout: float = 10.0):
+        super().stop(timeout)
+        self._db.close()
 
     def set_handlers(self):
         self._app.add_handler(CommandHandler("start", self._cmd_start))
         self._app.add_handler(CommandHandler("help", self._cmd_help))
+        self._app.add_handler(CommandHandler("search", self._cmd_search))
         self._app.add_handler(CallbackQueryHandler(self._on_callback))
         self._app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._on_text))
 
@@ -35,8 +50,28 @@ class TelegramReviewBot(TelegramCore):
 
     async def _cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(
-            "Use os botões para aprovar/editar/cancelar transações."
+            "Use os botões para aprovar/editar/cancelar transações.\n"
+            "/search <termo> busca transações pela descrição."
+        )
+
+    async def _cmd_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if self._allowed_chat_id and str(update.effective_chat.id) != str(self._allowed_chat_id):
+            return
+
+        query = clip_search_query(" ".join(context.args or []))
+        if not query:
+            await update.message.reply_text("Uso: /search <termo>")
+            return
+        text, keyboard = await self._search_message(query, 0)
+        await update.message.reply_text(text, reply_markup=keyboard)
+
+    async def _search_message(self, query: str, page: int):
+        # One extra row tells whether there is a next page.
+        transactions = await self._transactions.search_transactions(
+            query, SEARCH_PAGE_SIZE + 1, page * SEARCH_PAGE_SIZE
         )
+        has_next = len(transactions) > SEARCH_PAGE_SIZE
+        return build_search_message(query, transactions[:SEARCH_PAGE_SIZE], page, has_next)
 
     async def _on_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         q = update.callback_query
@@ -46,6 +81,12 @@ class TelegramReviewBot(TelegramCore):
             return
 
         data = q.data or ""
+        if data.startswith("SEARCH:"):
+            _, page_str, query = data.split(":", 2)
+            text, keyboard = await self._search_message(query, int(page_str))
+            with contextlib.suppress(Exception):
+                await q.edit_message_text(text, reply_markup=keyboard)
+            return
         if data.startswith("APPROVE:"):
             review_id = int(data.split(":", 1)[1])
             await self._approve_review(review_id)
@@ -66,7 +107,7 @@ class TelegramReviewBot(TelegramCore):
             await self._replace_message_for_review(
                 q,
                 review_id,
-                self._review_prompt_text(review_id, "Selecione a categoria:"),
+                await self._review_prompt_text(review_id, "Selecione a categoria:"),
                 reply_markup=kb,
             )
             return
@@ -89,7 +130,7 @@ class TelegramReviewBot(TelegramCore):
             await self._replace_message_for_review(
                 q,
                 review_id,
-                self._review_prompt_text(
+                await self._review_prompt_text(
                     review_id, "Envie a nova descrição respondendo esta mensagem."
                 ),
             )
@@ -103,26 +144,22 @@ class TelegramReviewBot(TelegramCore):
             return
 
         reply_msg = update.message.reply_to_message
-        with get_connection() as conn:
-            repo = ReviewRepository(conn)
-            review = repo.get_review_by_message(
-                str(update.effective_chat.id), str(reply_msg.message_id)
-            )
-            if not review or review.id is None:
-                return
-            review_id = review.id
+        review = await self._reviews.get_review_by_message(
+            str(update.effective_chat.id), str(reply_msg.message_id)
+        )
+        if not review or review.id is None:
+            return
+        review_id = review.id
         new_desc = update.message.text.strip()
         if not new_desc:
             return
 
-        with get_connection() as conn:
-            repo = ReviewRepository(conn)
-            repo.update_review_final(
-                review_id,
-                new_desc,
-                review.final_category or review.suggested_category,
-                review.final_nickname or review.suggested_nickname,
-            )
+        await self._reviews.update_review_final(
+            review_id,
+            new_desc,
+            review.final_category or review.suggested_category,
+            review.final_nickname or review.suggested_nickname,
+        )
 
         with contextlib.suppress(Exception):
             await update.message.reply_to_message.delete()
@@ -130,7 +167,7 @@ class TelegramReviewBot(TelegramCore):
         await self._send_review_message(update.effective_chat.id, review_id)
 
     async def _approve_review(self, review_id: int):
-        with get_connection() as conn:
+        def approve(conn):
             repo = ReviewRepository(conn)
             review = repo.get_review(review_id)
             if not review:
@@ -141,13 +178,13 @@ class TelegramReviewBot(TelegramCore):
             repo.update_review_final(review_id, final_desc, final_cat, final_nick)
             repo.update_review_status(review_id, "approved")
 
+        await self._db.run(approve)
+
     async def _cancel_review(self, review_id: int):
-        with get_connection() as conn:
-            repo = ReviewRepository(conn)
-            repo.update_review_status(review_id, "cancelled")
+        await self._reviews.update_review_status(review_id, "cancelled")
 
     async def _set_category(self, review_id: int, category: str):
-        with get_connection() as conn:
+        def set_category(conn):
             repo = ReviewRepository(conn)
             review = repo.get_review(review_id)
             if not review:
@@ -159,6 +196,8 @@ class TelegramReviewBot(TelegramCore):
                 review.final_nickname or review.suggested_nickname,
             )
 
+        await self._db.run(set_category)
+
     async def _replace_message(self, query, text: str, reply_markup=None):
         with contextlib.suppress(Exception):
             await query.message.delete()
@@ -170,56 +209,38 @@ class TelegramReviewBot(TelegramCore):
         with contextlib.suppress(Exception):
             await query.message.delete()
         msg = await query.message.chat.send_message(text, reply_markup=reply_markup)
-        with get_connection() as conn:
-            repo = ReviewRepository(conn)
-            repo.update_review_telegram(review_id, str(msg.chat_id), str(msg.message_id))
+        await self._reviews.update_review_telegram(
+            review_id, str(msg.chat_id), str(msg.message_id)
+        )
 
     async def _replace_message_with_status(self, query, review_id: int, status: str):
-        with get_connection() as conn:
-            review_repo = ReviewRepository(conn)
-            tx_repo = TransactionRepository(conn)
-            review = review_repo.get_review(review_id)
-            if not review:
-                return
-            tx = tx_repo.get_transaction(review.mp_id)
-            if not tx:
-                return
-            text = build_status_message(review, tx, status)
+        review, tx = await self._reviews.get_review_with_transaction(review_id)
+        if not review or not tx:
+            return
+        text = build_status_message(review, tx, status)
 
         with contextlib.suppress(Exception):
             await query.message.delete()
         await query.message.chat.send_message(text)
 
     async def _send_review_message(self, chat_id: int, review_id: int):
-        with get_connection() as conn:
-            review_repo = ReviewRepository(conn)
-            tx_repo = TransactionRepository(conn)
-            review = review_repo.get_review(review_id)
-            if not review:
-                return
-            tx = tx_repo.get_transaction(review.mp_id)
-            if not tx:
-                return
-            text, keyboard = build_review_message(review, tx)
+        review, tx = await self._reviews.get_review_with_transaction(review_id)
+        if not review or not tx:
+            return
+        text, keyboard = build_review_message(review, tx)
 
         msg = await self._app.bot.send_message(
             chat_id=chat_id,
             text=text,
             reply_markup=keyboard,
         )
-        with get_connection() as conn:
-            review_repo = ReviewRepository(conn)
-            review_repo.update_review_telegram(review_id, str(chat_id), str(msg.message_id))
-
-    def _review_prompt_text(self, review_id: int, prompt: str) -> str:
-        with get_connection() as conn:
-            review_repo = ReviewRepository(conn)
-            tx_repo = TransactionRepository(conn)
-            review = review_repo.get_review(review_id)
-            if not review:
-                return prompt
-            tx = tx_repo.get_transaction(review.mp_id)
-            if not tx:
-                return prompt
-            text, _ = build_review_message(review, tx)
+        await self._reviews.update_review_telegram(
+            review_id, str(chat_id), str(msg.message_id)
+        )
+
+    async def _review_prompt_text(self, review_id: int, prompt: str) -> str:
+        review, tx = await self._reviews.get_review_with_transaction(review_id)
+        if not review or not tx:
+            return prompt
+        text, _ = build_review_message(review, tx)
         return f"{text}\n\n{prompt}"
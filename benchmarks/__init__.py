@@ -0,0 +1 @@
+# Micro-benchmarks for the scraper and storage hot paths.
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from app.domain.models import Transaction
+from app.processing.bulk_classifier import RESULT_COLUMNS, classify_frame
+from app.processing.classifier import classify_transactions
+from app.processing.payer_index import PayerIndex
+from app.processing.rules import RuleTable
+from app.processing.suggestions import SuggestionIndex
+from benchmarks.classifier_rules import build_config
+
+NAMES_TO_NICKNAMES = {"fulano de tal": "Fulano", "marcos pereira da silva": "Marcos"}
+EXTRA_ROWS = [
+    ("Rendimentos", "Conta remunerada"),
+    ("Transferência Pix recebida", "Fulano de Tal"),
+    ("Transferência Pix recebida", "Fulano Tal de"),
+    ("Transferência Pix recebida", "Tal Fulano de"),
+    ("Transferência recebida", "Marcos Pereira Sil"),
+    ("Transferência recebida", "Desconhecido"),
+    ("Transferência Pix enviada", "Marcos Pereira"),
+    ("Dinheiro reservado", "Viagem"),
+    ("Dinheiro retirado", "13 Oséias"),
+    ("Compra", "Loja {x}"),
+    ("Compra", "Lojas X Centro"),
+]
+# Written-review history, so both paths also exercise exact and fuzzy
+# suggestions.
+HISTORY = [
+    ("loja {x}", "Compra na loja", "Mercado geral", 3),
+    ("loja x centro", "Compra no centro", "Mercado geral", 1),
+    ("desconhecido", "Transferência", "Outros", 2),
+]
+
+
+def build_corpus(config: dict, size: int) -> list[Transaction]:
+    rng = random.Random(11)
+    exact = [(rule["primary"], rule["counterparty"]) for rule in config["exact"]]
+    corpus = []
+    for i in range(size):
+        primary, counterparty = rng.choice(EXTRA_ROWS if i % 3 == 0 else exact)
+        corpus.append(
+            Transaction.from_scrape(
+                mp_id=str(i),
+                occurred_at="2026-03-14 10:00",
+                amount_signed=rng.choice([-1, 1]) * rng.uniform(5, 6000),
+                description_primary=primary,
+                description_secondary=counterparty,
+            )
+        )
+    return corpus
+
+
+def to_frame(transactions: list[Transaction]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "description_primary": [t.description_primary for t in transactions],
+            "description_secondary": [t.description_secondary for t in transactions],
+            "amount": [t.amount for t in transactions],
+            "direction": [t.direction for t in transactions],
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-row classifier vs the vectorized bulk classifier."
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--merchants", type=int, default=500)
+    args = parser.parse_args()
+
+    config = build_config(args.merchants)
+    rules = RuleTable.compile(config)
+    corpus = build_corpus(config, args.rows)
+    frame = to_frame(corpus)
+    suggestions = SuggestionIndex.build(HISTORY)
+    payers = PayerIndex(NAMES_TO_NICKNAMES)
+
+    start = time.perf_counter()
+    per_row = classify_transactions(
+        corpus, NAMES_TO_NICKNAMES, rules, suggestions, payers
+    )
+    per_row_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = classify_frame(frame, NAMES_TO_NICKNAMES, rules, suggestions, payers)
+    bulk_s = time.perf_counter() - start
+
+    expected = pd.DataFrame(
+        [
+            (
+                item.classification.kind,
+                item.classification.suggested_description,
+                item.classification.suggested_category,
+                item.classification.suggested_nickname,
+                item.classification.score,
+            )
+            for item in per_row
+        ],
+        columns=RESULT_COLUMNS,
+    )
+    mismatches = 0
+    for column in RESULT_COLUMNS:
+        left = expected[column].astype(object)
+        right = bulk[column].astype(object)
+        mismatches += int((~((left == right) | (left.isna() & right.isna()))).sum())
+    if mismatches:
+        print(f"MISMATCH: {mismatches} differing cells")
+        raise SystemExit(1)
+
+    print(f"rows={args.rows} rules={len(rules.exact)} outputs match the per-row path")
+    print(f"per-row:    {per_row_s:7.3f} s  ({args.rows / per_row_s:>10.0f} rows/s)")
+    print(f"vectorized: {bulk_s:7.3f} s  ({args.rows / bulk_s:>10.0f} rows/s)")
+    print(f"speedup:    {per_row_s / bulk_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from app.domain.models import Transaction
+from app.processing.rules import DEFAULT_RULES_PATH, RuleTable, classify_transaction
+
+PRIMARIES = [
+    "Pagamento com QR Pix",
+    "Pagamento",
+    "Pagamento de contas",
+    "Transferência Pix enviada",
+    "Transferência enviada",
+]
+
+
+def build_config(extra_merchants: int) -> dict:
+    config = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+    for i in range(extra_merchants):
+        config["exact"].append(
+            {
+                "primary": PRIMARIES[i % len(PRIMARIES)],
+                "counterparty": f"Comércio Número {i} Ltda",
+                "description": f"Compra {i}",
+                "category": "Mercado geral",
+            }
+        )
+    return config
+
+
+def build_corpus(config: dict, size: int) -> list[Transaction]:
+    rng = random.Random(7)
+    rules = config["exact"]
+    corpus = []
+    for i in range(size):
+        if i % 4 == 0:
+            primary, counterparty = rng.choice(PRIMARIES), f"Desconhecido {i}"
+        else:
+            rule = rng.choice(rules)
+            primary, counterparty = rule["primary"], rule["counterparty"]
+        corpus.append(
+            Transaction.from_scrape(
+                mp_id=str(i),
+                occurred_at="2026-03-14 10:00",
+                amount_signed=-rng.uniform(5, 5000),
+                description_primary=primary,
+                description_secondary=counterparty,
+            )
+        )
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Classification cost as the rule table grows."
+    )
+    parser.add_argument("--transactions", type=int, default=20_000)
+    args = parser.parse_args()
+
+    names_to_nicknames = {"fulano de tal": "Fulano"}
+    for extra in (0, 100, 500, 2000):
+        config = build_config(extra)
+        start = time.perf_counter()
+        table = RuleTable.compile(config)
+        compile_ms = (time.perf_counter() - start) * 1000
+        corpus = build_corpus(config, args.transactions)
+
+        start = time.perf_counter()
+        for transaction in corpus:
+            classify_transaction(transaction, names_to_nicknames, table)
+        elapsed = time.perf_counter() - start
+        print(
+            f"rules={len(table.exact):5d}  compile={compile_ms:6.1f} ms  "
+            f"classify={elapsed / len(corpus) * 1e6:6.2f} us/tx"
+        )
+
+
+if __name__ == "__main__":
+    main()
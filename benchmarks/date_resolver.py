@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import dateparser
+
+from app.processing import date_utils
+
+WEEKDAYS = [
+    "segunda-feira",
+    "terça-feira",
+    "quarta-feira",
+    "quinta-feira",
+    "sexta-feira",
+    "sábado",
+    "domingo",
+]
+MONTHS = [
+    "janeiro",
+    "fevereiro",
+    "março",
+    "abril",
+    "maio",
+    "junho",
+    "julho",
+    "agosto",
+    "setembro",
+    "outubro",
+    "novembro",
+    "dezembro",
+]
+
+
+def build_corpus(reference: datetime, days: int) -> list[str]:
+    # Headers as the movements page renders them over a few months.
+    corpus = ["Hoje", "Ontem"]
+    for offset in range(2, days):
+        day = reference - timedelta(days=offset)
+        month = MONTHS[day.month - 1]
+        corpus.append(f"{day.day} de {month}")
+        corpus.append(f"{WEEKDAYS[day.weekday()].capitalize()}, {day.day} de {month}")
+        corpus.append(f"{day.day} de {month} de {day.year}")
+        corpus.append(f"{day.day} de {month[:3]}.")
+    return corpus
+
+
+def _dateparser_reference(text: str, reference: datetime) -> str:
+    dt = dateparser.parse(
+        text,
+        languages=["pt"],
+        settings={
+            "TIMEZONE": "UTC",
+            "RETURN_AS_TIMEZONE_AWARE": False,
+            "RELATIVE_BASE": reference,
+        },
+    )
+    return dt.strftime("%Y-%m-%d")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the fast-path date resolver with dateparser."
+    )
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    reference = datetime(2026, 3, 14, 22, 30)
+    corpus = build_corpus(reference, args.days)
+
+    expected = [_dateparser_reference(text, reference) for text in corpus]
+    actual = [date_utils.resolve_relative_date(text, reference) for text in corpus]
+    mismatches = [
+        (text, want, got)
+        for text, want, got in zip(corpus, expected, actual)
+        if want != got
+    ]
+    for text, want, got in mismatches:
+        print(f"MISMATCH {text!r}: dateparser={want} resolver={got}")
+    if mismatches:
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in corpus:
+            _dateparser_reference(text, reference)
+    dateparser_s = time.perf_counter() - start
+
+    date_utils._resolve.cache_clear()
+    start = time.perf_counter()
+    for text in corpus:
+        date_utils.resolve_relative_date(text, reference)
+    cold_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in corpus:
+            date_utils.resolve_relative_date(text, reference)
+    warm_s = time.perf_counter() - start
+
+    calls = len(corpus) * args.repeat
+    print(f"headers={len(corpus)} outputs match dateparser exactly")
+    print(f"dateparser:       {dateparser_s / calls * 1e6:8.1f} us/header")
+    print(f"resolver (cold):  {cold_s / len(corpus) * 1e6:8.1f} us/header")
+    print(f"resolver (memo):  {warm_s / calls * 1e6:8.1f} us/header")
+    print(f"speedup (cold):   {dateparser_s / calls / (cold_s / len(corpus)):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from app.storage.db import MIGRATIONS, migrate, open_connection
+from app.storage.repo import ReviewRepository, TransactionRepository
+
+# The base schema (MIGRATIONS[0]) has no explicit indexes; every one in a
+# fully migrated database was added later. Dropping them all reproduces the
+# original table scans while keeping every column the repository now reads
+# (counterparty_key, suggestion_score, ...); stopping migrate() at version 1
+# would not.
+
+TX_STATUSES = ["sent"] * 90 + ["ignored"] * 8 + ["new", "classified"]
+REVIEW_STATUSES = ["written"] * 90 + ["cancelled"] * 8 + ["approved", "awaiting_user"]
+
+
+def _populate(conn: sqlite3.Connection, rows: int) -> None:
+    rng = random.Random(42)
+    tx_rows = []
+    review_rows = []
+    for i in range(rows):
+        mp_id = f"2024-01-01 00:00:{i:016x}"
+        occurred_at = f"20{18 + i * 8 // rows:02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00"
+        tx_rows.append(
+            (
+                mp_id,
+                occurred_at,
+                rng.uniform(1, 500),
+                rng.choice(["in", "out"]),
+                "Pagamento com QR Pix",
+                f"Loja {rng.randint(1, 5000)}",
+                "",
+                rng.choice(TX_STATUSES),
+            )
+        )
+        review_rows.append(
+            (
+                mp_id,
+                "spent",
+                rng.choice(REVIEW_STATUSES),
+                "123456",
+                str(i),
+                occurred_at,
+            )
+        )
+    conn.executemany(
+        """
+        INSERT INTO transactions
+            (mp_id, occurred_at, amount, direction, description_primary, description_secondary, description, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        tx_rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO reviews (mp_id, kind, status, telegram_chat_id, telegram_message_id, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        review_rows,
+    )
+    conn.commit()
+
+
+def _queries(conn: sqlite3.Connection, rows: int):
+    tx_repo = TransactionRepository(conn)
+    review_repo = ReviewRepository(conn)
+    message_id = str(rows // 2)
+    # Keyset cursors from a real first page, so the next-page calls run the
+    # row-value predicate the iterators use.
+    first_tx = tx_repo.get_transactions_by_status("new", 50)[-1]
+    first_review = review_repo.list_reviews_by_status("approved", 50)[-1]
+    tx_after = (first_tx.occurred_at, first_tx.mp_id)
+    review_after = (first_review.created_at, first_review.id)
+    return {
+        "get_transactions_by_status": lambda: tx_repo.get_transactions_by_status("new", 50),
+        "get_transactions_by_status (next page)": lambda: tx_repo.get_transactions_by_status(
+            "new", 50, after=tx_after
+        ),
+        "list_reviews_by_status": lambda: review_repo.list_reviews_by_status("approved", 50),
+        "list_reviews_by_status (next page)": lambda: review_repo.list_reviews_by_status(
+            "approved", 50, after=review_after
+        ),
+        "get_review_by_message": lambda: review_repo.get_review_by_message("123456", message_id),
+    }
+
+
+def _drop_indexes(conn: sqlite3.Connection) -> list[str]:
+    # Returns the CREATE statements so the same indexes can be rebuilt.
+    # Automatic indexes (primary keys, UNIQUE) have no SQL and stay.
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    conn.commit()
+    return [sql for _, sql in indexes]
+
+
+def _executed_sql(conn: sqlite3.Connection, call) -> list[str]:
+    # The statements a repository method really runs (parameters inlined),
+    # so the plans below follow the code instead of a hand-copied query.
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+def _measure(conn: sqlite3.Connection, rows: int, repeat: int) -> dict[str, tuple[float, str]]:
+    results = {}
+    for name, call in _queries(conn, rows).items():
+        plan = "; ".join(
+            row[3]
+            for sql in _executed_sql(conn, call)
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")
+        )
+        start = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        results[name] = ((time.perf_counter() - start) / repeat * 1000, plan)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Show the hot-path queries before and after the index migration."
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = open_connection(str(Path(tmp) / "bench.db"))
+        migrate(conn)
+        indexes = _drop_indexes(conn)
+        _populate(conn, args.rows)
+        before = _measure(conn, args.rows, args.repeat)
+        for sql in indexes:
+            conn.execute(sql)
+        conn.commit()
+        after = _measure(conn, args.rows, args.repeat)
+        conn.close()
+
+    print(
+        f"rows={args.rows} schema_version={len(MIGRATIONS)}, "
+        f"{len(indexes)} indexes dropped -> rebuilt"
+    )
+    scans_left = False
+    for name in before:
+        before_ms, before_plan = before[name]
+        after_ms, after_plan = after[name]
+        print(f"{name}: {before_ms:.2f} ms -> {after_ms:.3f} ms")
+        print(f"  before: {before_plan}")
+        print(f"  after:  {after_plan}")
+        if "SCAN" in after_plan or "TEMP B-TREE" in after_plan:
+            scans_left = True
+    if scans_left:
+        raise SystemExit("A hot-path query still scans or sorts.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.scraper.html_parser import parse_transactions_html
+
+DEFAULT_SNAPSHOT = Path(__file__).resolve().parent / "fixtures" / "movements_sample.html"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure browser-free parser throughput on saved snapshots."
+    )
+    parser.add_argument("snapshots", nargs="*", default=[str(DEFAULT_SNAPSHOT)])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = [Path(p).read_text(encoding="utf-8") for p in args.snapshots]
+    reference = datetime(2026, 3, 14, 12, 0)
+
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for html in pages:
+            rows += len(parse_transactions_html(html, reference))
+    elapsed = time.perf_counter() - start
+
+    parsed_pages = len(pages) * args.repeat
+    print(f"pages={parsed_pages} rows={rows} elapsed={elapsed:.3f}s")
+    print(f"{parsed_pages / elapsed:.1f} pages/s, {rows / elapsed:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
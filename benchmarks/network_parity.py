@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+from app.scraper.html_parser import parse_transactions_html
+from app.scraper.network import UnexpectedPayloadError, parse_movements_payload
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+DEFAULT_SNAPSHOT = FIXTURES / "movements_sample.html"
+DEFAULT_PAYLOAD = FIXTURES / "movements_sample.json"
+# When the sample page was captured; resolves its "Hoje"/"Ontem" headers.
+REFERENCE = datetime(2026, 3, 14, 12, 0)
+
+
+def _row(transaction) -> tuple:
+    return (
+        transaction.mp_id,
+        transaction.occurred_at,
+        transaction.amount,
+        transaction.direction,
+    )
+
+
+def _unexpected_shapes(payload: dict) -> dict[str, object]:
+    # Payloads the old candidate-key lookup would have mapped somehow.
+    first = payload["results"][0]
+    renamed = {key: value for key, value in first.items() if key != "direction"}
+    return {
+        "list under 'data'": {"data": payload["results"]},
+        "bare list": payload["results"],
+        "direction under 'type'": {"results": [{**renamed, "type": first["direction"]}]},
+        "unknown direction": {"results": [{**first, "direction": "debit"}]},
+        "amount as text": {"results": [{**first, "amount": str(first["amount"])}]},
+        "date without timezone": {"results": [{**first, "date_created": "2026-03-14T10:00:00"}]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Check the XHR parser against the DOM parse of the same page."
+    )
+    parser.add_argument("--snapshot", default=str(DEFAULT_SNAPSHOT))
+    parser.add_argument("--payload", default=str(DEFAULT_PAYLOAD))
+    args = parser.parse_args()
+
+    html = Path(args.snapshot).read_text(encoding="utf-8")
+    payload = json.loads(Path(args.payload).read_text(encoding="utf-8"))
+
+    dom = parse_transactions_html(html, REFERENCE)
+    network = parse_movements_payload(payload)
+    dom_rows = sorted(map(_row, dom))
+    network_rows = sorted(map(_row, network))
+    if dom_rows != network_rows:
+        differing = set(dom_rows) ^ set(network_rows)
+        print(f"MISMATCH: {len(differing)} rows differ, e.g. {sorted(differing)[:3]}")
+        raise SystemExit(1)
+
+    accepted = []
+    for name, shape in _unexpected_shapes(payload).items():
+        try:
+            parse_movements_payload(shape)
+        except UnexpectedPayloadError:
+            continue
+        accepted.append(name)
+    if accepted:
+        print("ACCEPTED unexpected shapes: " + ", ".join(accepted))
+        raise SystemExit(1)
+
+    print(f"rows={len(dom)} XHR and DOM parses match; unexpected shapes rejected")
+
+
+if __name__ == "__main__":
+    main()
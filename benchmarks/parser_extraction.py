@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from app.scraper.parser import parse_transactions_page
+
+DEFAULT_SNAPSHOT = Path(__file__).resolve().parent / "fixtures" / "movements_sample.html"
+
+
+def _time_mode(page, mode: str, repeat: int) -> tuple[float, list]:
+    result = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = parse_transactions_page(page, mode=mode)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare locator and single-evaluate extraction on a saved page."
+    )
+    parser.add_argument("snapshot", nargs="?", default=str(DEFAULT_SNAPSHOT))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    html = Path(args.snapshot).read_text(encoding="utf-8")
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page()
+        page.set_content(html)
+
+        locators_s, locators_txs = _time_mode(page, "locators", args.repeat)
+        evaluate_s, evaluate_txs = _time_mode(page, "evaluate", args.repeat)
+        browser.close()
+
+    if [t.mp_id for t in locators_txs] != [t.mp_id for t in evaluate_txs]:
+        raise SystemExit("Extraction modes disagree on the parsed transactions.")
+
+    print(f"rows={len(evaluate_txs)} repeat={args.repeat}")
+    print(f"locators: {locators_s * 1000:.1f} ms/page")
+    print(f"evaluate: {evaluate_s * 1000:.1f} ms/page")
+    print(f"speedup:  {locators_s / evaluate_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
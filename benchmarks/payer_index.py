@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.processing.name_utils import encode_name
+from app.processing.payer_index import PayerIndex
+
+FIRST = ["ana", "bruno", "carla", "diego", "elisa", "fabio", "gabriela", "hugo", "iara", "joao"]
+LAST = ["silva", "souza", "oliveira", "pereira", "costa", "rodrigues", "almeida", "nunes"]
+
+# (transfer name, sheet name, should match): near misses must not credit
+# another resident; truncated and reordered names still must.
+REGRESSION_CASES = [
+    ("Joao Carlos dos Santos Silva", "José Carlos dos Santos Silva", False),
+    ("Marcio Pereira da Silva", "Marcos Pereira da Silva", False),
+    ("Ana Paula Souza Lima", "Ana Paula Souza", False),
+    ("Fulano de T", "Fulano de Tal", True),
+    ("Fulano Tal de", "Fulano de Tal", True),
+    ("Tal Fulano de", "Fulano de Tal", True),
+    ("Marcos Pereira Sil", "Marcos Pereira da Silva", True),
+    ("Marcos Pereira", "Marcos Pereira da Silva", True),
+    ("Silva Marcos Pereira", "Marcos Pereira da Silva", True),
+]
+# A name that fits two residents is left to the user.
+AMBIGUOUS_CASE = ("Marcos Pereira", ("Marcos Pereira da Silva", "Marcos Pereira Souza"))
+
+
+def build_names(count: int, rng: random.Random) -> dict[str, str]:
+    names: dict[str, str] = {}
+    while len(names) < count:
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)} {len(names)}"
+        names[name] = f"Morador {len(names) % 40}"
+    return names
+
+
+def build_queries(names: list[str], count: int, rng: random.Random) -> list[str]:
+    # Truncated, reordered and unknown names, all distinct so the per-run
+    # cache never answers.
+    queries: set[str] = set()
+    for attempt in range(count * 20):
+        if len(queries) == count:
+            break
+        words = rng.choice(names).split()
+        kind = attempt % 3
+        if kind == 0:
+            query = " ".join(words)[: -rng.randint(1, 4)]
+        elif kind == 1:
+            rest = words[1:]
+            rng.shuffle(rest)
+            query = " ".join([words[0], *rest])
+        else:
+            query = f"{rng.choice(FIRST)} {rng.choice(LAST)} desconhecido {attempt}"
+        if query not in names:
+            queries.add(query)
+    return list(queries)
+
+
+def check_regressions() -> None:
+    failures = []
+    for transfer, sheet, expected in REGRESSION_CASES:
+        match = PayerIndex({encode_name(sheet): "Morador"}).match(encode_name(transfer))
+        if (match is not None) != expected:
+            failures.append(f"{transfer!r} vs {sheet!r}: got {match}")
+        elif match is not None and match.score >= 1.0:
+            failures.append(f"{transfer!r} vs {sheet!r}: inexact match scored {match.score}")
+    transfer, sheets = AMBIGUOUS_CASE
+    index = PayerIndex({encode_name(sheet): sheet for sheet in sheets})
+    match = index.match(encode_name(transfer))
+    if match is not None:
+        failures.append(f"{transfer!r} vs {sheets!r}: picked {match.nickname}")
+    if failures:
+        print("REGRESSION: " + "; ".join(failures))
+        raise SystemExit(1)
+    print(f"regression cases: {len(REGRESSION_CASES) + 1} ok")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fuzzy payer-name lookup latency.")
+    parser.add_argument("--queries", type=int, default=5_000)
+    args = parser.parse_args()
+
+    check_regressions()
+    rng = random.Random(5)
+    for aliases in (50, 200, 500, 1000):
+        names = build_names(aliases, rng)
+        start = time.perf_counter()
+        index = PayerIndex(names)
+        build_ms = (time.perf_counter() - start) * 1000
+        queries = build_queries(list(names), args.queries, rng)
+
+        start = time.perf_counter()
+        matched = sum(index.match(query) is not None for query in queries)
+        elapsed = time.perf_counter() - start
+        print(
+            f"aliases={aliases:5d}  build={build_ms:6.1f} ms  "
+            f"lookup={elapsed / len(queries) * 1e6:7.1f} us  matched={matched}/{len(queries)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import tempfile
+from datetime import date, timedelta
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from app.jobs.scrape_job import (
+    INCREMENTAL_MAX_PAGES,
+    STATE_LAST_MP_ID,
+    STATE_LAST_OCCURRED_AT,
+    run_scrape_job,
+)
+from app.scraper.parser import parse_days_payload
+from app.scraper.readiness import READY, ReadinessPolicy, ReadinessResult
+from app.storage.db import close_thread_connections, get_connection
+from app.storage.repo import TransactionRepository
+
+ROWS_PER_PAGE = 3
+NEWEST_DAY = date(2024, 3, 31)
+MONTHS = ["janeiro", "fevereiro", "março"]
+
+
+def build_history(pages: int) -> dict[int, list[dict]]:
+    # One day per page, newest first, shaped like the evaluate() payload.
+    history = {}
+    for page_number in range(1, pages + 1):
+        day = NEWEST_DAY - timedelta(days=page_number)
+        title = f"{day.day} de {MONTHS[day.month - 1]} de {day.year}"
+        rows = [
+            {
+                "description_primary": "Transferência Pix enviada",
+                "description_secondary": f"Pagina {page_number} linha {row}",
+                "amount_text": f"-R$ {page_number},{row:02d}",
+                "time_text": f"{12 - row}h00",
+            }
+            for row in range(ROWS_PER_PAGE)
+        ]
+        history[page_number] = [{"title": title, "rows": rows}]
+    return history
+
+
+class ScriptedTab:
+    def __init__(self, history: dict[int, list[dict]]) -> None:
+        self._history = history
+        self.page_number = 1
+
+    def evaluate(self, script: str, selectors: dict) -> list[dict]:
+        return self._history.get(self.page_number, [])
+
+
+class ScriptedClient:
+    # Stands in for MercadoPagoClient: serves a fixed history one page per
+    # navigation and records which pages were requested. Past the last page
+    # the list either never renders (timeout, like the real wait) or renders
+    # empty.
+    def __init__(self, history: dict[int, list[dict]], timeout_past_end: bool = True) -> None:
+        self._history = history
+        self._timeout_past_end = timeout_past_end
+        self.page = ScriptedTab(history)
+        self.readiness_policy = ReadinessPolicy()
+        self.last_page_stats = None
+        self.requested: list[int] = []
+
+    def goto_home(self) -> str:
+        return READY
+
+    def ensure_logged_in(self, state: str | None = None) -> ReadinessResult:
+        return ReadinessResult("ready", 1, 0.0)
+
+    def begin_page_stats(self, page: str) -> None:
+        pass
+
+    def end_page_stats(self) -> None:
+        return None
+
+    def start_movements(self, page_number: int | None = None, page=None) -> None:
+        page = page or self.page
+        page.page_number = page_number or 1
+        self.requested.append(page.page_number)
+
+    def wait_for_movements(self, page=None) -> None:
+        page = page or self.page
+        if self._timeout_past_end and page.page_number not in self._history:
+            raise PlaywrightTimeoutError("Timeout waiting for the movements list")
+
+
+class ScriptedSession:
+    def __init__(self, client: ScriptedClient) -> None:
+        self._client = client
+
+    @contextlib.contextmanager
+    def acquire(self):
+        yield self._client
+
+
+def check_cap_keeps_mark(history: dict[int, list[dict]], mark_page: int) -> str:
+    mark = max(parse_days_payload(history[mark_page]), key=lambda t: t.occurred_at)
+    with get_connection() as conn:
+        repo = TransactionRepository(conn)
+        repo.save_state(STATE_LAST_MP_ID, mark.mp_id)
+        repo.save_state(STATE_LAST_OCCURRED_AT, mark.occurred_at)
+
+    client = ScriptedClient(history)
+    run_scrape_job(session=ScriptedSession(client))
+    with get_connection() as conn:
+        stored = TransactionRepository(conn).load_state(STATE_LAST_MP_ID)
+
+    expected_pages = min(mark_page, INCREMENTAL_MAX_PAGES)
+    if client.requested != list(range(1, expected_pages + 1)):
+        return f"mark on page {mark_page}: paged {client.requested}"
+    if mark_page > INCREMENTAL_MAX_PAGES and stored != mark.mp_id:
+        return f"mark on page {mark_page}: moved past unfetched rows to {stored}"
+    if mark_page <= INCREMENTAL_MAX_PAGES and stored == mark.mp_id:
+        return f"mark on page {mark_page}: not advanced after reaching it"
+    return ""
+
+
+def check_backfill_ends_at_last_page(
+    history: dict[int, list[dict]], timeout_past_end: bool
+) -> str:
+    client = ScriptedClient(history, timeout_past_end)
+    total, _, _ = run_scrape_job(max_pages=len(history) + 5, session=ScriptedSession(client))
+    label = "timeout" if timeout_past_end else "empty list"
+    if client.requested != list(range(1, len(history) + 2)):
+        return f"backfill past the end ({label}): paged {client.requested}"
+    if total != len(history) * ROWS_PER_PAGE:
+        return f"backfill past the end ({label}): kept {total} rows"
+    return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Incremental paging stop conditions against a scripted history."
+    )
+    parser.add_argument("--pages", type=int, default=15)
+    args = parser.parse_args()
+
+    history = build_history(args.pages)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_PATH"] = os.path.join(tmp, "paging.db")
+        for mark_page in (3, args.pages - 1):
+            failure = check_cap_keeps_mark(history, mark_page)
+            if failure:
+                failures.append(failure)
+        for timeout_past_end in (True, False):
+            failure = check_backfill_ends_at_last_page(history, timeout_past_end)
+            if failure:
+                failures.append(failure)
+        close_thread_connections()
+
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        raise SystemExit(1)
+    print(f"pages={args.pages} paging checks ok")
+
+
+if __name__ == "__main__":
+    main()